@@ -1,10 +1,13 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import json
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Optional, Tuple
 import streamlit as st
 import extra_streamlit_components as stx
 from st_ant_tree import st_ant_tree
 
+from impulse_core.logger import MONGO_SUMMARY_PROJECTION, MongoTail, ensure_mongo_indexes, find_trace_tree, resolve_blobs
+from impulse_core.tree import TraceForest, TraceTreeNode, build_trace_trees
 from utils import mdb
 
 st.set_page_config(layout="wide", page_title="Impulse", page_icon = "assets/images/favicon.png")
@@ -30,42 +33,129 @@ def init_session_var(name: str, value: Any = True):
     if name not in st.session_state:
         st.session_state[name] = value
 
+BLOB_COLLECTION = "blobs"
+CACHE_TTL_S = 30
+SESSION_PAGE_SIZE = 50
+SESSION_SCAN_LIMIT = 20_000 ## most recent calls scanned for sessions
+LIVE_INTERVAL_S = 2
+
+## Queries: results are cached for CACHE_TTL_S, keyed by their arguments, so widget reruns don't hit the database
+@st.cache_resource
+def get_blob_cache() -> Dict[str, Any]:
+    return {}
+
+@st.cache_resource
+def index_collection(collection_name: str) -> None:
+    ensure_mongo_indexes(db[collection_name])
+
+@st.cache_data(ttl=CACHE_TTL_S)
+def list_collections() -> List[str]:
+    return [c for c in db.list_collection_names() if c != BLOB_COLLECTION]
+
+@st.cache_data(ttl=CACHE_TTL_S)
+def list_threads(collection_name: str, anchor: Optional[str]) -> List[str]:
+    query = {"payload.function.name": anchor} if anchor else {}
+    threads = db[collection_name].distinct("payload.trace_module.thread_id", query)
+    return [t for t in threads if t != "root"]
+
+@st.cache_data(ttl=CACHE_TTL_S)
+def list_sessions(collection_name: str, anchor: Optional[str], page: int) -> Tuple[List[str], bool]:
+    """
+    One page of sessions, most recent first, and whether there are more.
+    Sessions are found through their calls (or the anchor's calls), so a running
+    session is listed before its global root segments are written. Only the last
+    SESSION_SCAN_LIMIT calls are grouped (read newest first off the start-time index), 
+    so the cost doesn't grow with the collection; older sessions are not listed.
+    """
+    query = {"payload.function.name": anchor} if anchor else {"payload.trace_module.session_id": {"$ne": None}}
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"payload.timestamps.start": -1}},
+        {"$limit": SESSION_SCAN_LIMIT},
+        {"$group": {"_id": "$payload.trace_module.session_id", "last": {"$max": "$payload.timestamps.start"}}},
+        {"$sort": {"last": -1, "_id": 1}},
+        {"$skip": page * SESSION_PAGE_SIZE},
+        {"$limit": SESSION_PAGE_SIZE + 1}
+    ]
+    sessions = [doc["_id"] for doc in db[collection_name].aggregate(pipeline)]
+    return sessions[:SESSION_PAGE_SIZE], len(sessions) > SESSION_PAGE_SIZE
+
+@st.cache_data(ttl=CACHE_TTL_S)
+def load_tree(collection_name: str, session: str, thread: str, anchor: Optional[str]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """
+    Root call_id and the summaries (no arguments / outputs) of the session's calls in the thread.
+    Without an anchor, the tree is built from the records themselves: the global root is
+    only written in segments, so it is None (and its calls are the top level) until the
+    first one is flushed.
+    """
+    collection = db[collection_name]
+    if anchor:
+        root_doc = collection.find_one({"payload.trace_module.session_id": session, "payload.function.name": anchor},
+                                       projection={"payload.call_id": 1, "_id": 0})
+        if root_doc is None:
+            return None, []
+        docs = find_trace_tree(collection, root_doc["payload"]["call_id"],
+                               match={"payload.trace_module.session_id": session,
+                                      "payload.trace_module.thread_id": thread})
+        return root_doc["payload"]["call_id"], [doc["payload"] for doc in docs]
+
+    docs = collection.find({"payload.trace_module.session_id": session,
+                            "payload.trace_module.thread_id": {"$in": [thread, "root"]}},
+                           MONGO_SUMMARY_PROJECTION).sort("payload.timestamps.start", 1)
+    summaries = [doc["payload"] for doc in docs]
+    root_call_id = next((s["call_id"] for s in summaries if s["trace_module"]["thread_id"] == "root"), None)
+    return root_call_id, summaries
+
+@st.cache_data(ttl=CACHE_TTL_S)
+def read_record(collection_name: str, call_id: str) -> Dict[str, Any]:
+    """
+    Full record of the selected call, loaded only once it is selected.
+    The global root's segments share its call_id, so they are merged into one record.
+    """
+    docs = db[collection_name].find({"payload.call_id": call_id}, {"payload": 1, "_id": 0})
+    node = build_trace_trees(doc["payload"] for doc in docs).get(call_id)
+    return read_node({"payload": None if node is None else node.record})
+
+def live_forest(collection_name: str, session: str, thread: str, anchor: Optional[str], 
+                summaries: List[Dict[str, Any]]) -> TraceForest:
+    """
+    Live mode: the session's forest, kept across reruns and extended with the records
+    that arrived since the last one (a change stream, or an _id watermark poll).
+    """
+    key = (collection_name, session, thread, anchor)
+    live = st.session_state.get("live")
+    if live is None or live["key"] != key:
+        if live is not None:
+            live["tail"].close()
+        ## tail from before the (possibly cached) summaries were read; repeats are skipped by the forest
+        tail = MongoTail(db[collection_name],
+                         query={"payload.trace_module.session_id": session,
+                                "payload.trace_module.thread_id": {"$in": [thread, "root"]}},
+                         start=datetime.now(timezone.utc) - timedelta(seconds=CACHE_TTL_S))
+        live = {"key": key, "forest": build_trace_trees(summaries), "tail": tail}
+        st.session_state["live"] = live
+    live["forest"].add(doc["payload"] for doc in live["tail"].poll())
+    return live["forest"]
+
 def read_node(node: Dict[str, Any]):
-    output = node["payload"]
+    output = resolve_blobs(node["payload"], mdb.blob_lookup(db[BLOB_COLLECTION], get_blob_cache()))
     return output
 
-def get_by_call_id(fns:List[Dict[str, Any]], call_id: str) -> Dict[str, Any]:
-    for fn in fns:
-        if fn["call_id"] == call_id:
-            return fn
-    return None
-
-def format_name(node: str) -> str:
+def format_name(node: Dict[str, Any]) -> str:
     name = node["function"]["name"] if node["function"]["name"] != "<module>" else "root"
-    args = ", ".join([f"{k}" for k in node["arguments"].keys()])
+    args = ", ".join([f"{k}" for k in node["function"].get("args") or (node.get("arguments") or {}).keys()])
     return f"{name}({args})"
 
 # https://flucas96-streamlit-tree-select-example-app-s0vkjx.streamlit.app/
-def gen_tree(root: Dict[str, Any], fns: List[Dict[str, Any]]):
-    if root["stack_trace"]["children"] == []:
-        return {
-            "title": format_name(root),
-            "value": json.dumps({k: v for k,v in root.items() if k != "stack_trace"})
-        }
-    else:
-        children = []
-        thread_set = [f["call_id"] for f in fns]
-        for child in root["stack_trace"]["children"]:
-            if child["call_id"] not in thread_set:
-                continue
-            child_node = get_by_call_id(fns, child["call_id"])
-            children.append( child_node)
-    
-        return {
-            "title": format_name(root),
-            "value": json.dumps({k: v for k,v in root.items() if k != "stack_trace"}),
-            "children": [ gen_tree(child, fns) for child in children ]
-        }
+def gen_tree(node: TraceTreeNode) -> Dict[str, Any]:
+    """
+    Tree select data for a rebuilt trace tree. Values are call_ids; the chosen
+    record is looked up in the forest.
+    """
+    output = {"title": format_name(node.record), "value": node.call_id}
+    if len(node.children) > 0:
+        output["children"] = [gen_tree(child) for child in node.children]
+    return output
 
 with app:
 
@@ -75,55 +165,47 @@ with app:
     ## Add a sidebar
     with st.sidebar:
 
-        collections = db.list_collection_names()
-        collection_name = st.selectbox("Select a collection", options=collections)
+        if st.button("Refresh"):
+            st.cache_data.clear()
+
+        collection_name = st.selectbox("Select a collection", options=list_collections())
         set_session_var("collection", collection_name)
-        collection = db[collection_name]
-        if collection is not None:
+        chosen_node = None
+        if collection_name is not None:
 
-            
-            if get_session_var("anchored"):
-                threads = collection.distinct("payload.trace_module.thread_id", 
-                                          {"payload.function.name": get_session_var("anchor")})
-            else:
-                threads = collection.distinct("payload.trace_module.thread_id")
-            
-            
-            threads = [t for t in threads if t != "root"]
-            thread = st.selectbox("Select a thread", options=threads)
+            index_collection(collection_name)
+            anchor = get_session_var("anchor") if get_session_var("anchored") else None
 
-            if get_session_var("anchored"):
-                sessions = collection.distinct("payload.trace_module.session_id",
-                                               {"payload.function.name": get_session_var("anchor")})
-                
-            else:
-                sessions = collection.distinct("payload.trace_module.session_id")
+            thread = st.selectbox("Select a thread", options=list_threads(collection_name, anchor))
 
-            old_sessions = sessions
+            init_session_var("session_page", 0)
+            page = st.session_state["session_page"]
+            sessions, has_more = list_sessions(collection_name, anchor, page)
             session = st.selectbox("Select a session", options=sessions)
 
-            fns = collection.find({"payload.trace_module.session_id": session,
-                                    "payload.trace_module.thread_id": thread},
-                                    projection={"payload": 1, "_id": 0})
-            
-            if get_session_var("anchored"):
-
-                root = collection.find({"payload.trace_module.session_id": session,
-                                    "payload.function.name": get_session_var("anchor")},
-                                    projection={"payload": 1, "_id": 0})
-
+            col1, col2, col3 = st.columns([1, 1, 1])
+            if col1.button("Newer", disabled=page == 0):
+                set_session_var("session_page", page - 1)
+                st.rerun()
+            col2.write(f"Page {page + 1}")
+            if col3.button("Older", disabled=not has_more):
+                set_session_var("session_page", page + 1)
+                st.rerun()
+
+            live = st.checkbox("Live", value=False, help="Follow new records in this session")
+
+            # Selection: the tree holds summaries only; bodies are read when a node is chosen
+            root_call_id, summaries = load_tree(collection_name, session, thread, anchor)
+            if live:
+                forest = live_forest(collection_name, session, thread, anchor, summaries)
             else:
-                root = collection.find({"payload.trace_module.session_id": session,
-                                    "payload.trace_module.thread_id": "root"},
-                                    projection={"payload": 1, "_id": 0})
-            
-            fns = list(fns)
-            root = list(root)[0]
-            
-            # Selection
-            root = read_node(root)
-            fns = [read_node(fn) for fn in fns]
-            tree = [gen_tree(root, fns)]
+                forest = build_trace_trees(summaries)
+            root = forest.get(root_call_id) if root_call_id is not None else None
+            if anchor is None:
+                ## the global root, once written, or its calls that have arrived so far
+                tree = [gen_tree(node) for node in forest.roots]
+            else:
+                tree = [gen_tree(root)] if root is not None else []
 
             "---"
 
@@ -137,9 +219,9 @@ with app:
             if chosen_node is not None:
 
                 if get_session_var("anchored"):
-                    chosen_node = root
+                    chosen_node = read_record(collection_name, root.call_id)
                 else:
-                    chosen_node = json.loads(chosen_node)
+                    chosen_node = read_record(collection_name, chosen_node)
 
                 col1, col2 = st.columns([1, 1])
                 if col1.button("Anchor"):
@@ -184,4 +266,8 @@ with app:
             
             with st.container():
                 if len(chosen_node["trace_logs"]) > 0:
-                    st.text_area("Trace", value=json.dumps(chosen_node["trace_logs"], indent=4), height=200)
\ No newline at end of file
+                    st.text_area("Trace", value=json.dumps(chosen_node["trace_logs"], indent=4), height=200)
+
+    if collection_name is not None and live:
+        time.sleep(LIVE_INTERVAL_S)
+        st.rerun()
@@ -1,7 +1,7 @@
 import os, json
 import pymongo as pm
 from datetime import datetime as dt
-from typing import List, Callable, Union, Any, Type
+from typing import List, Callable, Optional, Union, Any, Type
 from functools import lru_cache
 
 @lru_cache(maxsize=1)
@@ -27,3 +27,18 @@ def read_from_mdb(collection_name: str, query: dict) -> List[dict]:
     db = get_db()
     collection = db[collection_name]
     return list(collection.find(query))
+
+def blob_lookup(blobs: pm.collection.Collection, cache: Optional[dict] = None) -> Callable[[str], Any]:
+    """
+    Digest -> stored value over a logger's blob collection, for impulse_core.logger.resolve_blobs.
+    Raises KeyError for missing blobs, which resolve_blobs leaves in place.
+    """
+    cache = {} if cache is None else cache
+    def lookup(digest: str) -> Any:
+        if digest not in cache:
+            doc = blobs.find_one({"_id": digest})
+            if doc is None:
+                raise KeyError(digest)
+            cache[digest] = doc["value"]
+        return cache[digest]
+    return lookup
@@ -0,0 +1,52 @@
+"""
+Coroutine hooks writing to a local file: thread-pool LocalLogger vs the 
+asyncio-native AsyncioLocalLogger. Times N concurrent hooked coroutines end 
+to end, including draining the logger.
+
+    python -m benchmarks.bench_asyncio_logger [n_calls] [concurrency]
+"""
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+
+from impulse_core import tracer as tracer_module
+from impulse_core.logger import AsyncioLocalLogger, LocalLogger
+from impulse_core.tracer import ImpulseTracer
+
+N_CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+def run(logger_cls, **logger_kwargs) -> float:
+    target = tempfile.mkdtemp()
+    logger = logger_cls(uri = target, format = "jsonl", **logger_kwargs)
+    tracer = ImpulseTracer(logger, validation = "off")
+
+    @tracer.hook("bench")
+    async def handle(prompt: str, temperature: float = 0.0) -> str:
+        await asyncio.sleep(0)
+        return prompt[:8]
+
+    async def worker(n: int) -> None:
+        for _ in range(n):
+            await handle("hello world " * 10, temperature = 0.5)
+
+    async def main() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(N_CALLS // CONCURRENCY) for _ in range(CONCURRENCY)])
+        await tracer.ashutdown(flush_global_root = False)
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    tracer_module.IMPULSE_GLOBAL_ROOT.children.clear()
+    shutil.rmtree(target)
+    return N_CALLS / elapsed
+
+def main() -> None:
+    print(f"Coroutine hooks -> local file, {N_CALLS} calls, {CONCURRENCY} concurrent")
+    print(f"  LocalLogger (thread pool)  : {run(LocalLogger, flush_every = 0):10.0f} calls/s")
+    print(f"  AsyncioLocalLogger         : {run(AsyncioLocalLogger):10.0f} calls/s")
+
+if __name__ == "__main__":
+    main()
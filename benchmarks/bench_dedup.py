@@ -0,0 +1,63 @@
+"""
+Storage reduction from blob dedup on a synthetic LLM workload: every call 
+repeats one of a few system prompts and few-shot blocks, plus a unique question.
+
+    python -m benchmarks.bench_dedup [--records N] [--threshold BYTES]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from impulse_core.logger import LocalLogger
+
+SYSTEM_PROMPTS = [f"You are assistant #{i}. Follow the style guide carefully. " * 40 for i in range(3)]
+FEW_SHOTS = [
+    {"examples": [{"q": f"Example question {i}.{j}? " * 5, "a": f"Example answer {i}.{j}. " * 10} for j in range(5)]}
+    for i in range(4)
+]
+
+def record(i: int, rng: random.Random) -> dict:
+    question = f"Question {i}: " + " ".join(rng.choice(["what", "why", "how", "when"]) for _ in range(30))
+    return {
+        "call_id": f"call-{i}",
+        "arguments": {
+            "system": rng.choice(SYSTEM_PROMPTS),
+            "shots": rng.choice(FEW_SHOTS),
+            "question": question,
+            "temperature": 0.2
+        },
+        "output": f"Answer {i}. " * 20,
+        "status": "success"
+    }
+
+def run(n_records: int, **logger_kwargs) -> tuple:
+    target = tempfile.mkdtemp()
+    local_logger = LocalLogger(uri = target, format = "jsonl", flush_every = 0, **logger_kwargs)
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for i in range(n_records):
+        local_logger.log(record(i, rng), metadata = {"source": "benchmark"})
+    local_logger.shutdown()
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(target, f)) for f in os.listdir(target))
+    shutil.rmtree(target)
+    return size, n_records / elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type = int, default = 5000)
+    parser.add_argument("--threshold", type = int, default = 256)
+    opts = parser.parse_args()
+
+    plain, plain_rate = run(opts.records)
+    deduped, dedup_rate = run(opts.records, dedup_threshold = opts.threshold)
+    print(f"LocalLogger storage, {opts.records} records, dedup_threshold={opts.threshold}")
+    print(f"  plain   : {plain / 1e6:8.2f} MB  {plain_rate:8.0f} records/s")
+    print(f"  deduped : {deduped / 1e6:8.2f} MB  {dedup_rate:8.0f} records/s  (records + blobs)")
+    print(f"  reduction: {plain / deduped:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+MongoLogger throughput, one insert_one per record vs batched insert_many.
+
+Runs against mongomock with a simulated network round trip per request by
+default, or against a real server with --uri.
+
+    python -m benchmarks.bench_mongo_logger [--records N] [--latency-ms L] [--uri URI]
+"""
+import argparse
+import time
+from typing import Any, Dict
+
+
+from impulse_core import logger as logger_module
+from impulse_core.logger import MongoLogger
+
+def slow_client_factory(latency_ms: float):
+    import mongomock
+
+    class SlowCollection:
+        """
+        mongomock collection that sleeps once per round trip.
+        """
+        def __init__(self, collection):
+            self._collection = collection
+
+        def insert_one(self, *args, **kwargs):
+            time.sleep(latency_ms / 1000)
+            return self._collection.insert_one(*args, **kwargs)
+
+        def insert_many(self, *args, **kwargs):
+            time.sleep(latency_ms / 1000)
+            return self._collection.insert_many(*args, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self._collection, name)
+
+    class SlowDatabase:
+        def __init__(self, db):
+            self._db = db
+
+        def __getitem__(self, name):
+            return SlowCollection(self._db[name])
+
+    class SlowClient:
+        def __init__(self, *args, **kwargs):
+            self._client = mongomock.MongoClient()
+
+        def __getitem__(self, name):
+            return SlowDatabase(self._client[name])
+
+    return SlowClient
+
+def record(i: int) -> Dict[str, Any]:
+    return {
+        "call_id": f"call-{i}",
+        "arguments": {"prompt": "You are a helpful assistant. " * 20, "temperature": 0.2},
+        "output": "Sure, here is the answer. " * 10,
+        "status": "success",
+    }
+
+def run(n_records: int, **logger_kwargs) -> float:
+    mongo_logger = MongoLogger(collection_name = f"bench_{time.time_ns()}", **logger_kwargs)
+    start = time.perf_counter()
+    for i in range(n_records):
+        mongo_logger.log(record(i), metadata = {"source": "benchmark"})
+    mongo_logger.shutdown()
+    elapsed = time.perf_counter() - start
+    mongo_logger._collection.drop()
+    return n_records / elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type = int, default = 2000)
+    parser.add_argument("--latency-ms", type = float, default = 2.0)
+    parser.add_argument("--uri", type = str, default = None)
+    opts = parser.parse_args()
+
+    kwargs: Dict[str, Any] = {}
+    if opts.uri is not None:
+        kwargs["uri"] = opts.uri
+        target = opts.uri
+    else:
+        logger_module.pm.MongoClient = slow_client_factory(opts.latency_ms)
+        target = f"mongomock, {opts.latency_ms}ms simulated round trip"
+
+    print(f"MongoLogger throughput, {opts.records} records ({target})")
+    print(f"  insert_one          : {run(opts.records, **kwargs):10.0f} records/s")
+    print(f"  batched insert_many : {run(opts.records, batched = True, **kwargs):10.0f} records/s")
+
+if __name__ == "__main__":
+    main()
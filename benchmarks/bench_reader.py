@@ -0,0 +1,101 @@
+"""
+Read throughput of ImpulseLogReader on a large synthetic LocalLogger file,
+against loading every record with json.loads, and LocalLogIndex lookups.
+
+    python -m benchmarks.bench_reader [--mb SIZE] [--format jsonl|pretty]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from impulse_core.logger import LOCAL_ENTRY_SEP, encode_local_record
+import random
+
+from impulse_core.reader import ImpulseLogReader, LocalLogIndex
+
+N_SESSIONS = 100
+
+def record(i: int) -> dict:
+    start = f"2023-08-20 {10 + i // 3600000 % 12:02d}:{i // 60000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:06d}"
+    return {
+        "call_id": f"call-{i}",
+        "trace_module": {"tracer_id": "bench", "session_id": f"session-{i % N_SESSIONS}", 
+                         "thread_id": "default", "hook_id": f"hook-{i % 10}"},
+        "function": {"name": f"fn_{i % 10}", "type": "function"},
+        "timestamps": {"start": start, "end": start, "duration_seconds": 0.001},
+        "arguments": {"prompt": f"Question {i}: " + "lorem ipsum dolor sit amet " * 20},
+        "output": f"Answer {i}. " * 30,
+        "status": "error" if i % 100 == 0 else "success"
+    }
+
+def generate(path: str, size_mb: int, format: str) -> int:
+    target, n = size_mb * 1024 * 1024, 0
+    with open(path, "w") as f:
+        written = 0
+        while written < target:
+            sep = LOCAL_ENTRY_SEP if format == "pretty" else ""
+            chunk = "".join(encode_local_record(record(n + j), {"source": "benchmark"}, format) + sep for j in range(1000))
+            f.write(chunk)
+            written += len(chunk)
+            n += 1000
+    return n
+
+def naive(path: str, format: str, session_id: str = None) -> int:
+    count = 0
+    with open(path) as f:
+        if format == "jsonl":
+            lines = (line for line in f if line.strip())
+        else:
+            lines = (entry for entry in f.read().split(LOCAL_ENTRY_SEP) if entry.strip())
+        for line in lines:
+            entry = json.loads(line)
+            if session_id is None or entry["payload"]["trace_module"]["session_id"] == session_id:
+                count += 1
+    return count
+
+def timed(label: str, fn, size: int) -> None:
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28}: {size / 1e6 / elapsed:8.1f} MB/s  {count:>9} records  {elapsed:6.2f}s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type = int, default = 1024)
+    parser.add_argument("--format", default = "jsonl", choices = ["jsonl", "pretty"])
+    opts = parser.parse_args()
+
+    target = tempfile.mkdtemp()
+    path = os.path.join(target, f"logs.{opts.format}")
+    try:
+        n = generate(path, opts.mb, opts.format)
+        size = os.path.getsize(path)
+        print(f"ImpulseLogReader, {size / 1e6:.0f} MB {opts.format} file, {n} records")
+        timed("json.loads, all", lambda: naive(path, opts.format), size)
+        timed("reader, all", lambda: sum(1 for _ in ImpulseLogReader(path)), size)
+        timed("json.loads, one session", lambda: naive(path, opts.format, "session-7"), size)
+        timed("reader, one session", lambda: sum(1 for _ in ImpulseLogReader(path, session_id = "session-7")), size)
+        timed("reader, errors in a hook", lambda: sum(1 for _ in ImpulseLogReader(path, hook_id = "hook-0", status = "error")), size)
+
+        start = time.perf_counter()
+        index = LocalLogIndex.rebuild(path)
+        print(f"  index rebuild               : {time.perf_counter() - start:6.2f}s")
+        start = time.perf_counter()
+        index = LocalLogIndex(index.path)
+        print(f"  index load                  : {time.perf_counter() - start:6.2f}s")
+
+        call_ids = [f"call-{i}" for i in random.Random(0).sample(range(n), 1000)]
+        start = time.perf_counter()
+        found = sum(1 for call_id in call_ids if index.get(call_id) is not None)
+        print(f"  index get, by call_id       : {(time.perf_counter() - start) / found * 1e6:8.1f} us/call  ({found} calls)")
+        start = time.perf_counter()
+        count = len(index.session("session-7"))
+        print(f"  index session fetch         : {time.perf_counter() - start:6.3f}s  {count:>9} records")
+    finally:
+        shutil.rmtree(target)
+
+if __name__ == "__main__":
+    main()
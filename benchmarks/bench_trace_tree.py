@@ -0,0 +1,33 @@
+"""
+Cost of attaching and exporting children under a single root, the way the
+global root accumulates top-level calls in a long-running process.
+
+    python -m benchmarks.bench_trace_tree [max_children]
+"""
+import sys
+import time
+import uuid
+
+from impulse_core.tracer import ImpulseTraceNode
+
+MAX_CHILDREN = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+def run(n_children: int) -> float:
+    root = ImpulseTraceNode(name = "<module>", call_id = str(uuid.uuid4()), trace_module = None)
+    start = time.perf_counter()
+    for _ in range(n_children):
+        child = ImpulseTraceNode(name = "child", call_id = str(uuid.uuid4()), trace_module = None)
+        root.add_child(child)
+        child.export()
+    return time.perf_counter() - start
+
+def main() -> None:
+    print("ImpulseTraceNode add_child + export under one root")
+    n_children = 1000
+    while n_children <= MAX_CHILDREN:
+        elapsed = run(n_children)
+        print(f"  {n_children:>8} children : {elapsed:8.3f} s total, {elapsed / n_children * 1e6:8.2f} us/child")
+        n_children *= 10
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Per-call overhead of ImpulseTracer hooks.
+
+Measures the wrapper cost (hooked call minus bare call) for sync functions,
+coroutines and async generators, plus the argument binding step on its own
+(inspect.signature + sig.bind vs the precompiled CallPlan).
+
+    python -m benchmarks.bench_tracer [n_calls]
+"""
+import asyncio
+import inspect
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from impulse_core.logger import DummyLogger
+from impulse_core import tracer as tracer_module
+from impulse_core.tracer import ImpulseTracer
+
+N_CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+@dataclass
+class NullLogger(DummyLogger):
+    """
+    Drops every record on the caller thread, so only tracer overhead is timed.
+    """
+    def log(self, payload: Any, metadata: Optional[Dict[str, Any]] = None, *args, **kwargs) -> None:
+        pass
+
+def release_global_root() -> None:
+    # Keep the global root small so the timings isolate the per-call path
+    tracer_module.IMPULSE_GLOBAL_ROOT.children.clear()
+
+def per_call_us(fn, n: int = N_CALLS) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+        release_global_root()
+    return (time.perf_counter() - start) / n * 1e6
+
+def run_loop(coro_factory, n: int = N_CALLS) -> float:
+    async def main():
+        start = time.perf_counter()
+        for _ in range(n):
+            await coro_factory()
+            release_global_root()
+        return (time.perf_counter() - start) / n * 1e6
+    return asyncio.run(main())
+
+def route(prompt: str, model: str = "small", temperature: float = 0.0, retries: int = 2) -> str:
+    return model
+
+async def aroute(prompt: str, model: str = "small", temperature: float = 0.0, retries: int = 2) -> str:
+    return model
+
+async def astream(prompt: str, model: str = "small", temperature: float = 0.0, retries: int = 2):
+    for token in ("a", "b", "c"):
+        yield token
+
+async def consume(agen) -> None:
+    async for _ in agen:
+        pass
+
+def bench_binding(tracer: ImpulseTracer) -> None:
+    args, kwargs = ("hello world",), {"temperature": 0.7}
+
+    def legacy():
+        bound = inspect.signature(route).bind(*args, **kwargs)
+        bound.apply_defaults()
+        return {k: tracer._parse_item(v) for k, v in bound.arguments.items()}
+
+    print(f"  bind (legacy sig.bind)   : {per_call_us(legacy):8.2f} us/call")
+    try:
+        from impulse_core.tracer import CallPlan
+    except ImportError:
+        return
+    plan = CallPlan.compile(route, tracer._parse_item)
+    print(f"  bind (CallPlan)          : {per_call_us(lambda: plan.process(args, kwargs)):8.2f} us/call")
+
+def main() -> None:
+    tracer = ImpulseTracer(logger=NullLogger())
+    hooked_route = tracer.hook(thread_id="bench")(route)
+    hooked_aroute = tracer.hook(thread_id="bench")(aroute)
+    hooked_astream = tracer.hook(thread_id="bench")(astream)
+
+    print(f"ImpulseTracer overhead, {N_CALLS} calls")
+    bench_binding(tracer)
+
+    bare = per_call_us(lambda: route("hello world", temperature=0.7))
+    hooked = per_call_us(lambda: hooked_route("hello world", temperature=0.7))
+    print(f"  sync      overhead       : {hooked - bare:8.2f} us/call")
+
+    bare = run_loop(lambda: aroute("hello world", temperature=0.7))
+    hooked = run_loop(lambda: hooked_aroute("hello world", temperature=0.7))
+    print(f"  coroutine overhead       : {hooked - bare:8.2f} us/call")
+
+    bare = run_loop(lambda: consume(astream("hello world", temperature=0.7)))
+    hooked = run_loop(lambda: consume(hooked_astream("hello world", temperature=0.7)))
+    print(f"  asyncgen  overhead       : {hooked - bare:8.2f} us/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Rebuilding a session's call tree from its records: build_trace_trees against
+the app's previous approach (a linear get_by_call_id scan per child, and the 
+session's call_id list rebuilt at every level), and merging live records into 
+an existing forest against rebuilding it.
+
+    python -m benchmarks.bench_tree_build [max_calls]
+"""
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from impulse_core.tree import build_trace_trees
+
+MAX_CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+LARGE_SESSION = 1_000_000
+LIVE_SESSION = 100_000
+LIVE_BATCH = 100
+
+def session(n_calls: int) -> List[Dict[str, Any]]:
+    rng = random.Random(0)
+    records = [{"call_id": "c0", "timestamps": {"start": "0"}, "stack_trace": {"parents": [], "children": []}}]
+    for i in range(1, n_calls):
+        parent = records[rng.randrange(max(0, i - 50), i)]
+        record = {
+            "call_id": f"c{i}",
+            "timestamps": {"start": f"{i:08d}"},
+            "stack_trace": {"parents": [{"call_id": parent["call_id"]}], "children": []}
+        }
+        parent["stack_trace"]["children"].append({"call_id": record["call_id"]})
+        records.append(record)
+    return records
+
+def previous(root: Dict[str, Any], fns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    children = []
+    thread_set = [f["call_id"] for f in fns]
+    for child in root["stack_trace"]["children"]:
+        if child["call_id"] not in thread_set:
+            continue
+        children.append(next(fn for fn in fns if fn["call_id"] == child["call_id"]))
+    return {"value": root["call_id"], "children": [previous(child, fns) for child in children]}
+
+def main() -> None:
+    sys.setrecursionlimit(100_000)
+    print("Trace tree reconstruction for one session")
+    n_calls = 500
+    while n_calls <= MAX_CALLS:
+        records = session(n_calls)
+        start = time.perf_counter()
+        previous(records[0], records)
+        old = time.perf_counter() - start
+        start = time.perf_counter()
+        build_trace_trees(records)
+        new = time.perf_counter() - start
+        print(f"  {n_calls:>8} calls : previous {old * 1e3:10.1f} ms   build_trace_trees {new * 1e3:8.1f} ms   ({old / new:.0f}x)")
+        n_calls *= 10
+
+    records = session(LARGE_SESSION)
+    start = time.perf_counter()
+    build_trace_trees(records)
+    print(f"  {LARGE_SESSION:>8} calls : build_trace_trees {time.perf_counter() - start:.2f} s")
+
+    records = session(LIVE_SESSION)
+    forest = build_trace_trees(records[:-LIVE_BATCH])
+    start = time.perf_counter()
+    forest.add(records[-LIVE_BATCH:])
+    added = time.perf_counter() - start
+    start = time.perf_counter()
+    build_trace_trees(records)
+    rebuilt = time.perf_counter() - start
+    print(f"  {LIVE_BATCH} new calls into {LIVE_SESSION}: add {added * 1e3:.2f} ms   rebuild {rebuilt * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
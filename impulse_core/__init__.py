@@ -1,15 +1,54 @@
-from impulse_core.logger import BaseAsyncLogger, MongoLogger, LocalLogger
-from impulse_core.tracer import ImpulseTraceNode, ImpulseTracer, trace_log
-from impulse_core.schema import (
-    TraceSchema,
-    ContextNodeSchema,
-    StackTraceSchema,
-    TraceLogSchema,
-    TraceModuleSchema,
-    FunctionTimestampsSchema,
-    TracedFunctionSchema,
-    EMPTY_TRACE_TEMPLATE
-)
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from impulse_core.logger import BaseAsyncLogger, MongoLogger, LocalLogger, BaseAsyncioLogger, AsyncioLocalLogger, AsyncioMongoLogger
+    from impulse_core.tracer import ImpulseTraceNode, ImpulseTracer, trace_log, current_trace_context, attach_trace_context
+    from impulse_core.templates import EMPTY_TRACE_TEMPLATE
+    from impulse_core.collector import ImpulseCollector, CollectorLogger
+    from impulse_core.reader import ImpulseLogReader, LocalLogIndex
+    from impulse_core.serializer import ImpulseSerializer, SizeLimits
+    from impulse_core.sampling import BaseSampler, HeadSampler, TailSampler
+    from impulse_core.metrics import LatencyHistogram
+    from impulse_core.tree import TraceForest, TraceTreeNode, build_trace_trees
+    from impulse_core.schema import (
+        TraceSchema,
+        ContextNodeSchema,
+        StackTraceSchema,
+        TraceLogSchema,
+        TraceModuleSchema,
+        TraceSegmentSchema,
+        FunctionTimestampsSchema,
+        TracedFunctionSchema
+    )
+
+## Public names are imported from their modules on first access, so `import impulse_core`
+## stays cheap: pymongo only loads with the Mongo loggers, pydantic with the schemas / validation.
+_EXPORTS = {
+    **dict.fromkeys(["BaseAsyncLogger", "MongoLogger", "LocalLogger", "BaseAsyncioLogger",
+                     "AsyncioLocalLogger", "AsyncioMongoLogger"], "impulse_core.logger"),
+    **dict.fromkeys(["ImpulseTraceNode", "ImpulseTracer", "trace_log", "current_trace_context",
+                     "attach_trace_context"], "impulse_core.tracer"),
+    **dict.fromkeys(["EMPTY_TRACE_TEMPLATE"], "impulse_core.templates"),
+    **dict.fromkeys(["ImpulseCollector", "CollectorLogger"], "impulse_core.collector"),
+    **dict.fromkeys(["ImpulseLogReader", "LocalLogIndex"], "impulse_core.reader"),
+    **dict.fromkeys(["ImpulseSerializer", "SizeLimits"], "impulse_core.serializer"),
+    **dict.fromkeys(["BaseSampler", "HeadSampler", "TailSampler"], "impulse_core.sampling"),
+    **dict.fromkeys(["LatencyHistogram"], "impulse_core.metrics"),
+    **dict.fromkeys(["TraceForest", "TraceTreeNode", "build_trace_trees"], "impulse_core.tree"),
+    **dict.fromkeys(["TraceSchema", "ContextNodeSchema", "StackTraceSchema", "TraceLogSchema", "TraceModuleSchema",
+                     "TraceSegmentSchema", "FunctionTimestampsSchema", "TracedFunctionSchema"], "impulse_core.schema")
+}
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
 
 __all__ = [
     "ImpulseTraceNode",
@@ -17,13 +56,32 @@ __all__ = [
     "BaseAsyncLogger",
     "MongoLogger",
     "LocalLogger",
+    "BaseAsyncioLogger",
+    "AsyncioLocalLogger",
+    "AsyncioMongoLogger",
     "trace_log",
+    "current_trace_context",
+    "attach_trace_context",
+    "ImpulseCollector",
+    "CollectorLogger",
+    "ImpulseLogReader",
+    "LocalLogIndex",
+    "ImpulseSerializer",
+    "SizeLimits",
+    "BaseSampler",
+    "HeadSampler",
+    "TailSampler",
+    "LatencyHistogram",
+    "TraceForest",
+    "TraceTreeNode",
+    "build_trace_trees",
     "TraceSchema",
     "ContextNodeSchema",
     "StackTraceSchema",
     "TraceLogSchema",
     "TraceModuleSchema",
+    "TraceSegmentSchema",
     "FunctionTimestampsSchema",
     "TracedFunctionSchema",
     "EMPTY_TRACE_TEMPLATE"
-]
\ No newline at end of file
+]
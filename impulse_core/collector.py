@@ -0,0 +1,172 @@
+import functools as ft
+import multiprocessing as mp
+import os
+import queue
+import weakref
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from impulse_core.logger import BaseAsyncLogger, LocalLogger
+
+COLLECTOR_STOP = None
+
+def run_collector(records: Any,
+                  sink: Callable[..., BaseAsyncLogger],
+                  sink_kwargs: Dict[str, Any],
+                  batch_size: int,
+                  flush_interval_ms: float) -> None:
+    """
+    Collector process: owns the sink and writes whatever has arrived (up to
+    batch_size records) as one batch, until the stop sentinel is received.
+    """
+    writer = sink(**sink_kwargs)
+    interval = flush_interval_ms / 1000
+    done = False
+
+    while not done:
+        try:
+            item = records.get(timeout = interval)
+        except queue.Empty:
+            continue
+
+        batch: List[Tuple[Any, Optional[Dict[str, Any]]]] = []
+        while True:
+            if item is COLLECTOR_STOP:
+                done = True
+                break
+            batch.append(item)
+            if len(batch) >= batch_size:
+                break
+            try:
+                item = records.get_nowait()
+            except queue.Empty:
+                break
+
+        if len(batch) > 0:
+            try:
+                writer.write_batch(batch)
+            except Exception as e:
+                print(f"[TRACE WARNING]: Collector failed to write batch of {len(batch)} records: {e}")
+
+    writer.shutdown()
+
+@dataclass
+class ImpulseCollector:
+    """
+    Single writer process for multiprocess tracing.
+    Worker processes log through collector.logger(), which forwards records over
+    a multiprocessing queue; the collector process owns the sink and writes them
+    in batches, so there is only ever one writer per file / connection.
+     - Start it in the parent before forking workers (or pass the logger to
+       spawned workers as a Process argument).
+     - sink / sink_kwargs build the real logger inside the collector process,
+       so they must be picklable under the "spawn" start method.
+    """
+    sink: Callable[..., BaseAsyncLogger] = LocalLogger
+    sink_kwargs: Dict[str, Any] = field(default_factory = dict)
+    batch_size: int = 256
+    flush_interval_ms: float = 100.0
+    max_queue_size: int = 0
+    start_method: Optional[str] = None
+
+    def __post_init__(self):
+        assert self.batch_size > 0, "Batch size must be positive."
+        self._context = mp.get_context(self.start_method)
+        self._records = self._context.Queue(self.max_queue_size)
+        self._process: Optional[Any] = None
+
+    def start(self) -> "ImpulseCollector":
+        """
+        Start the collector process.
+        """
+        assert self._process is None, "Collector already started."
+        self._process = self._context.Process(
+            target = run_collector,
+            args = (self._records, self.sink, self.sink_kwargs, self.batch_size, self.flush_interval_ms),
+            name = "impulse-collector",
+            daemon = True
+        )
+        self._process.start()
+        return self
+
+    def logger(self) -> "CollectorLogger":
+        """
+        A logger forwarding to this collector, for use in any process.
+        """
+        return CollectorLogger(records = self._records)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the collector after it has written everything sent so far.
+        Shut down the workers' loggers first.
+        """
+        if self._process is None:
+            return
+        self._records.put(COLLECTOR_STOP)
+        self._process.join(timeout)
+        self._process = None
+
+@dataclass
+class CollectorLogger(BaseAsyncLogger):
+    """
+    Forwards records to an ImpulseCollector process.
+     - Plain records go straight onto the multiprocessing queue (its feeder
+       thread does the pickling); records with a before_write callback and
+       streams go through the worker thread first.
+     - Picklable, so it can be passed to spawned processes, and safe to inherit
+       through fork: the worker thread pool is rebuilt in the child.
+    """
+    uri: str = "collector"
+    num_threads: int = 1
+    records: Any = None
+
+    def __post_init__(self):
+        assert self.records is not None, "CollectorLogger needs the collector's queue (use ImpulseCollector.logger())."
+        super().__post_init__()
+        self._register_fork_handler()
+
+    def _register_fork_handler(self) -> None:
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child = ft.partial(_reinit_in_child, weakref.ref(self)))
+
+    def log(self,
+            payload: Union[str, Dict[str, Any], queue.Queue],
+            metadata: Optional[Dict[str, Any]] = None,
+            *args,
+            before_write: Optional[Callable[[Any], Any]] = None,
+            **kwargs) -> None:
+        if before_write is not None or isinstance(payload, queue.Queue):
+            return super().log(payload, metadata, *args, before_write = before_write, **kwargs)
+        if self._closed:
+            raise RuntimeError("Cannot log after the logger has been shut down.")
+        self.records.put((payload, metadata))
+
+    def _write(self,
+               payload: Union[str, Dict[str, Any]],
+               metadata: Optional[Dict[str, Any]] = None,
+               *args, **kwargs):
+        self.records.put((payload, metadata))
+
+    def _reinit(self) -> None:
+        """
+        Fresh queue and worker pool, for a forked child (threads don't survive 
+        fork) or an unpickled copy.
+        """
+        BaseAsyncLogger.__post_init__(self)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init and not f.name.startswith("_")}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for f in fields(self):
+            if f.name in state:
+                setattr(self, f.name, state[f.name])
+            elif f.default is not MISSING:
+                setattr(self, f.name, f.default)
+        self._reinit()
+        self._register_fork_handler()
+
+def _reinit_in_child(ref: "weakref.ref[CollectorLogger]") -> None:
+    logger = ref()
+    if logger is not None:
+        logger._reinit()
@@ -0,0 +1,29 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+class MissingModule(ModuleType):
+    """
+    Stand-in for an optional dependency that isn't installed: fails on first use.
+    """
+    def __getattr__(self, name: str):
+        raise ModuleNotFoundError(f"{self.__name__} is required for this feature (pip install {self.__name__}).")
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    A module that is only executed on first attribute access (importlib.util.LazyLoader),
+    so optional heavy dependencies cost nothing until they are used.
+     - Modules that are already imported are returned as they are.
+     - A missing module gives a MissingModule, which raises on first use.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        return MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
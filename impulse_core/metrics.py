@@ -0,0 +1,117 @@
+import math
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+HISTOGRAM_MAX_NS = 10 ** 12 # durations above ~16 minutes share the last bucket
+
+@dataclass
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with call and error counters.
+     - Buckets split every doubling of the duration into sub_buckets, so
+       quantiles are accurate to within a factor of 2 ** (1 / sub_buckets).
+     - Counts live in a flat array('Q'); recording a call is a log2, an index
+       and a few integer updates, with no allocation.
+     - max is exact; quantiles report the geometric middle of their bucket,
+       capped at max.
+    """
+    sub_buckets: int = 8
+    counts: array = field(init = False, repr = False)
+    calls: int = 0
+    errors: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+    def __post_init__(self):
+        assert self.sub_buckets > 0, "sub_buckets must be positive."
+        self._n_buckets = int(math.log2(HISTOGRAM_MAX_NS) * self.sub_buckets) + 1
+        self.counts = array("Q", bytes(8 * self._n_buckets))
+        self._lock = threading.Lock()
+
+    def record(self, duration_ns: int, error: bool = False) -> None:
+        """
+        Count one call.
+        """
+        idx = int(math.log2(duration_ns) * self.sub_buckets) if duration_ns > 1 else 0
+        if idx >= self._n_buckets:
+            idx = self._n_buckets - 1
+        with self._lock:
+            self.counts[idx] += 1
+            self.calls += 1
+            self.total_ns += duration_ns
+            if error:
+                self.errors += 1
+            if duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+
+    def quantile(self, q: float) -> float:
+        """
+        Duration (ns) below which a fraction q of the calls fall.
+        """
+        assert 0.0 <= q <= 1.0, "Quantile must be in [0, 1]."
+        if self.calls == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.calls))
+        if rank >= self.calls:
+            return float(self.max_ns)
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(2 ** ((idx + 0.5) / self.sub_buckets), float(self.max_ns))
+        return float(self.max_ns)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Counters and p50 / p90 / p99 / max latencies, in seconds.
+        reset: bool     - start a new measurement window after reading
+        """
+        with self._lock:
+            output = {
+                "calls": self.calls,
+                "errors": self.errors,
+                "error_rate": self.errors / self.calls if self.calls else 0.0,
+                "mean_seconds": self.total_ns / self.calls / 1e9 if self.calls else 0.0,
+                "p50_seconds": self.quantile(0.5) / 1e9,
+                "p90_seconds": self.quantile(0.9) / 1e9,
+                "p99_seconds": self.quantile(0.99) / 1e9,
+                "max_seconds": self.max_ns / 1e9
+            }
+            if reset:
+                self.counts = array("Q", bytes(8 * self._n_buckets))
+                self.calls = self.errors = self.total_ns = self.max_ns = 0
+        return output
+
+@dataclass
+class HookMetrics:
+    """
+    Latency histograms keyed by (thread_id, hook_id).
+    Hooks look up their histogram once, when they are created.
+    """
+    sub_buckets: int = 8
+    histograms: Dict[Tuple[str, str], LatencyHistogram] = field(default_factory = dict)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def histogram(self, thread_id: str, hook_id: str) -> LatencyHistogram:
+        key = (thread_id, hook_id)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram(sub_buckets = self.sub_buckets)
+            return self.histograms[key]
+
+    def snapshot(self, reset: bool = False) -> List[Dict[str, Any]]:
+        """
+        One entry per hook that has seen at least one call.
+        """
+        with self._lock:
+            items = list(self.histograms.items())
+        output = []
+        for (thread_id, hook_id), hist in items:
+            if hist.calls == 0:
+                continue
+            output.append({"thread_id": thread_id, "hook_id": hook_id, **hist.snapshot(reset = reset)})
+        return output
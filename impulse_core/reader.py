@@ -0,0 +1,371 @@
+import gzip
+import json
+import mmap
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
+
+from impulse_core.logger import LOCAL_ENTRY_SEP, LOCAL_FORMAT_JSONL, LOCAL_FORMAT_PRETTY, \
+    load_local_blobs, resolve_blobs, select_segments
+
+READ_CHUNK_SIZE = 1024 * 1024
+FILTER_FIELDS = ("session_id", "thread_id", "hook_id", "status")
+TIMESTAMP_PATTERN = re.compile(rb'"timestamps":\s*\{\s*"start":\s*"([^"]*)"')
+INDEX_FIELDS = ("session_id", "thread_id", "hook_id")
+
+FilterValue = Optional[Union[str, Iterable[str]]]
+
+def detect_format(head: bytes) -> str:
+    """
+    "pretty" entries open with "{" on a line of its own, "jsonl" entries don't.
+    """
+    head = head.lstrip()
+    if head.startswith(b"{\n") or head.startswith(b"{\r\n"):
+        return LOCAL_FORMAT_PRETTY
+    return LOCAL_FORMAT_JSONL
+
+@dataclass
+class ImpulseLogReader:
+    """
+    Streams records back from LocalLogger output, one at a time.
+     - Plain files are memory-mapped; gzipped segments (*.gz) are read in chunks.
+     - Works with both formats ("pretty" and "jsonl"), detected from the file.
+     - Filters are pushed down: each raw entry is matched as bytes first, and
+       only entries that can match are decoded (then checked exactly).
+    Filters (None = any; a string or a collection of allowed values):
+    session_id / thread_id / hook_id / status     - trace_module / record fields
+    start / end: str    - bounds on the call's start timestamp, "%Y-%m-%d %H:%M:%S.%f"
+    source: str         - log_metadata["source"] (e.g. "impulse_tracer" to skip metrics dumps)
+    Dedup blob references are resolved if the logger's blob sidecar is found
+    (load_blobs = False leaves them as references).
+    """
+    path: str
+    session_id: FilterValue = None
+    thread_id: FilterValue = None
+    hook_id: FilterValue = None
+    status: FilterValue = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    source: FilterValue = None
+    entry_sep: str = LOCAL_ENTRY_SEP
+    blobs_path: Optional[str] = None
+    load_blobs: bool = True
+    paths: List[str] = field(default_factory = list)
+
+    def __post_init__(self):
+        if len(self.paths) == 0:
+            self.paths = [self.path]
+        if not self.load_blobs:
+            self.blobs_path = None
+        elif self.blobs_path is None and os.path.exists(self.path + ".blobs"):
+            self.blobs_path = self.path + ".blobs"
+
+        self._expected: Dict[str, frozenset] = {}
+        self._patterns: List[Pattern[bytes]] = []
+        for name in FILTER_FIELDS + ("source",):
+            values = getattr(self, name)
+            if values is None:
+                continue
+            values = frozenset([values] if isinstance(values, str) else values)
+            self._expected[name] = values
+            alternatives = b"|".join(re.escape(json.dumps(v).encode()) for v in sorted(values))
+            self._patterns.append(re.compile(b'"' + name.encode() + rb'":\s*(?:' + alternatives + b")"))
+
+        self._blobs: Optional[Dict[str, Any]] = None
+        if self.blobs_path is not None:
+            self._blobs = load_local_blobs(self.blobs_path)
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str, **filters: Any) -> "ImpulseLogReader":
+        """
+        Read a rotated log through its manifest, opening only the segments
+        whose time range overlaps [start, end].
+        """
+        paths = select_segments(manifest_path, filters.get("start"), filters.get("end"))
+        if "blobs_path" not in filters and filters.get("load_blobs", True):
+            base = manifest_path[:-len(".manifest.json")]
+            candidates = [p + ".blobs" for p in (base + ext for ext in (".json", ".jsonl", ""))]
+            filters["blobs_path"] = next((p for p in candidates if os.path.exists(p)), None)
+        return cls(path = manifest_path, paths = paths, **filters)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        Matching entries as {"payload", "log_metadata"}.
+        """
+        for _, _, entry in self.scan():
+            yield entry
+
+    def payloads(self) -> Iterator[Any]:
+        """
+        Matching records' payloads.
+        """
+        for entry in self:
+            yield entry["payload"]
+
+    def scan(self) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        """
+        Matching entries as (offset, length, entry); offsets are into the
+        (uncompressed) file the entry was read from.
+        """
+        for path in self.paths:
+            for buffer, pos, end, base in self._raw_entries(path):
+                if not self._prefilter(buffer, pos, end):
+                    continue
+                entry = json.loads(buffer[pos:end])
+                if not self._matches(entry):
+                    continue
+                if self._blobs is not None:
+                    entry = resolve_blobs(entry, self._blobs.__getitem__)
+                yield base + pos, end - pos, entry
+
+    def _raw_entries(self, path: str) -> Iterator[Tuple[Any, int, int, int]]:
+        """
+        Entry boundaries as (buffer, start, end, buffer offset in the file), 
+        without copying the entry.
+        """
+        if path.endswith(".gz"):
+            with gzip.open(path, "rb") as gz:
+                yield from self._split_stream(gz)
+            return
+
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+            sep = self._separator(mm[:64])
+            pos, size = 0, len(mm)
+            while pos < size:
+                end = mm.find(sep, pos)
+                if end == -1:
+                    end = size
+                if end - pos > 1:
+                    yield mm, pos, end, 0
+                pos = end + len(sep)
+
+    def _split_stream(self, f: Any) -> Iterator[Tuple[Any, int, int, int]]:
+        """
+        _raw_entries for compressed files, over a rolling chunk buffer.
+        """
+        buffer, offset = b"", 0
+        sep: Optional[bytes] = None
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            if sep is None:
+                sep = self._separator(chunk[:64])
+            buffer += chunk
+
+            pos = 0
+            while True:
+                end = buffer.find(sep, pos)
+                if end == -1:
+                    break
+                if end - pos > 1:
+                    yield buffer, pos, end, offset
+                pos = end + len(sep)
+            offset += pos
+            buffer = buffer[pos:]
+
+        if len(buffer.strip()) > 0:
+            yield buffer, 0, len(buffer), offset
+
+    def _separator(self, head: bytes) -> bytes:
+        if detect_format(head) == LOCAL_FORMAT_PRETTY:
+            return self.entry_sep.encode()
+        return b"\n"
+
+    def _prefilter(self, buffer: Any, pos: int, end: int) -> bool:
+        for pattern in self._patterns:
+            if pattern.search(buffer, pos, end) is None:
+                return False
+        if self.start is not None or self.end is not None:
+            match = TIMESTAMP_PATTERN.search(buffer, pos, end)
+            if match is not None:
+                started = match.group(1).decode()
+                if (self.start is not None and started < self.start) or \
+                        (self.end is not None and started > self.end):
+                    return False
+        return True
+
+    def _matches(self, entry: Dict[str, Any]) -> bool:
+        if "source" in self._expected and \
+                (entry.get("log_metadata") or {}).get("source") not in self._expected["source"]:
+            return False
+
+        payload = entry.get("payload")
+        if not isinstance(payload, dict):
+            return all(name == "source" for name in self._expected) and self.start is None and self.end is None
+
+        module = payload.get("trace_module") or {}
+        for name, values in self._expected.items():
+            if name == "source":
+                continue
+            actual = payload.get("status") if name == "status" else module.get(name)
+            if actual not in values:
+                return False
+
+        if self.start is not None or self.end is not None:
+            started = (payload.get("timestamps") or {}).get("start")
+            if not isinstance(started, str):
+                return False
+            if (self.start is not None and started < self.start) or \
+                    (self.end is not None and started > self.end):
+                return False
+        return True
+
+def index_path_for(path: str) -> str:
+    """
+    Default index location for a log file or manifest, as LocalLogger(index = True) writes it.
+    """
+    if path.endswith(".manifest.json"):
+        return path[:-len(".manifest.json")] + ".index.jsonl"
+    return os.path.splitext(path)[0] + ".index.jsonl"
+
+@dataclass
+class LocalLogIndex:
+    """
+    Offset index over LocalLogger output: finds records by call_id, session_id,
+    thread_id or hook_id without scanning the log.
+     - Loads the {name}.index.jsonl sidecar written by LocalLogger(index = True);
+       each entry gives the file, byte offset and length of one record.
+     - rebuild() regenerates the sidecar from the log itself.
+     - A call_id logged more than once resolves to its latest record; the
+       session / thread / hook lists keep every record, in write order.
+    Records in gzipped segments are read by decompressing up to their offset.
+    """
+    path: str
+    blobs_path: Optional[str] = None
+    entries: List[Dict[str, Any]] = field(init = False, default_factory = list)
+
+    def __post_init__(self):
+        self._directory = os.path.dirname(self.path)
+        self._by_call_id: Dict[str, Dict[str, Any]] = {}
+        self._by_field: Dict[str, Dict[Any, List[Dict[str, Any]]]] = {name: {} for name in INDEX_FIELDS}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding = "utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError: # torn last line after a crash
+                        break
+                    self._add(entry)
+
+        if self.blobs_path is None:
+            base = self.path[:-len(".index.jsonl")]
+            candidates = [base + ext + ".blobs" for ext in (".json", ".jsonl", "")]
+            self.blobs_path = next((p for p in candidates if os.path.exists(p)), None)
+        self._blobs: Optional[Dict[str, Any]] = None
+        if self.blobs_path is not None:
+            self._blobs = load_local_blobs(self.blobs_path)
+
+    @classmethod
+    def rebuild(cls, log_path: str, index_path: Optional[str] = None) -> "LocalLogIndex":
+        """
+        Rebuild the index from a log file or a rotation manifest, replacing the sidecar.
+        log_path: str                   - LocalLogger file, or its *.manifest.json
+        index_path: Optional[str]       - where to write the index (default: next to the log)
+        """
+        index_path = index_path or index_path_for(log_path)
+        if log_path.endswith(".manifest.json"):
+            paths = select_segments(log_path)
+        else:
+            paths = [log_path]
+
+        entries = []
+        for path in paths:
+            for offset, length, entry in ImpulseLogReader(path, load_blobs = False).scan():
+                payload = entry.get("payload")
+                if not isinstance(payload, dict) or "call_id" not in payload:
+                    continue
+                module = payload.get("trace_module") or {}
+                entries.append({
+                    "call_id": payload["call_id"],
+                    **{name: module.get(name) for name in INDEX_FIELDS},
+                    "file": os.path.basename(path),
+                    "offset": offset,
+                    "length": length
+                })
+
+        tmp = index_path + ".tmp"
+        with open(tmp, "w", encoding = "utf-8") as f:
+            f.write("".join(json.dumps(entry, separators = (",", ":")) + "\n" for entry in entries))
+        os.replace(tmp, index_path)
+        return cls(index_path)
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        self._by_call_id[entry["call_id"]] = entry
+        for name in INDEX_FIELDS:
+            self._by_field[name].setdefault(entry.get(name), []).append(entry)
+
+    def locate(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Index entry of a call ({"file", "offset", "length", ...}), or None.
+        """
+        return self._by_call_id.get(call_id)
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Payload of a call, or None if it isn't indexed.
+        """
+        entry = self.locate(call_id)
+        if entry is None:
+            return None
+        return self._read([entry])[0]
+
+    def session(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Payloads of every record in a session, in write order.
+        """
+        return self._read(self._by_field["session_id"].get(session_id, []))
+
+    def thread(self, thread_id: str) -> List[Dict[str, Any]]:
+        return self._read(self._by_field["thread_id"].get(thread_id, []))
+
+    def hook(self, hook_id: str) -> List[Dict[str, Any]]:
+        return self._read(self._by_field["hook_id"].get(hook_id, []))
+
+    def keys(self, name: str) -> List[Any]:
+        """
+        Distinct values of an indexed field ("session_id", "thread_id" or "hook_id").
+        """
+        assert name in INDEX_FIELDS, f"Unknown index field {name}."
+        return list(self._by_field[name].keys())
+
+    def _read(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Payloads of index entries, keeping one handle open per file.
+        """
+        handles: Dict[str, Any] = {}
+        output = []
+        try:
+            for entry in entries:
+                name = entry["file"]
+                if name not in handles:
+                    handles[name] = self._open(name)
+                f = handles[name]
+                f.seek(entry["offset"])
+                payload = json.loads(f.read(entry["length"]))["payload"]
+                if self._blobs is not None:
+                    payload = resolve_blobs(payload, self._blobs.__getitem__)
+                output.append(payload)
+        finally:
+            for f in handles.values():
+                f.close()
+        return output
+
+    def _open(self, name: str) -> Any:
+        """
+        Open a segment by the name it was indexed under, following compression.
+        """
+        path = os.path.join(self._directory, name)
+        if os.path.exists(path):
+            return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+        if os.path.exists(path + ".gz"):
+            return gzip.open(path + ".gz", "rb")
+        if path.endswith(".gz") and os.path.exists(path[:-len(".gz")]):
+            return open(path[:-len(".gz")], "rb")
+        raise FileNotFoundError(f"Indexed log file {path} not found.")
@@ -0,0 +1,64 @@
+import random
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, Optional
+
+@dataclass
+class BaseSampler:
+    """
+    Sampling policy for traced calls. Keeps everything.
+    Subclass and override sample_head() / sample_tail() for custom policies.
+     - The head decision is made once per root trace (a hooked call with no hooked
+       ancestor); nested calls inherit it, so a tree is kept or dropped as a whole.
+     - Calls dropped at the head skip argument / output serialization entirely,
+       unless the sampler uses tail sampling, in which case the raw values are
+       held until the call completes and serialized only if sample_tail() keeps it.
+    """
+    TAIL_SAMPLING: ClassVar[bool] = False
+
+    def sample_head(self, trace_module: Dict[str, Any]) -> bool:
+        """
+        Decide whether to record the trace rooted at this call, before it runs.
+        trace_module: Dict[str, Any]    - tracer / session / thread / hook ids of the call
+        """
+        return True
+
+    def sample_tail(self, status: str, duration_seconds: float) -> bool:
+        """
+        Decide whether to keep a call that was dropped at the head, after it completes.
+        status: str                 - "success" or "error"
+        duration_seconds: float     - time to complete the call
+        """
+        return False
+
+@dataclass
+class HeadSampler(BaseSampler):
+    """
+    Keeps a fixed fraction of root traces.
+    """
+    rate: float = 1.0
+    seed: Optional[int] = None
+    _rng: random.Random = field(init = False, repr = False)
+
+    def __post_init__(self):
+        assert 0.0 <= self.rate <= 1.0, "Sampling rate must be in [0, 1]."
+        self._rng = random.Random(self.seed)
+
+    def sample_head(self, trace_module: Dict[str, Any]) -> bool:
+        return self.rate >= 1.0 or self._rng.random() < self.rate
+
+@dataclass
+class TailSampler(HeadSampler):
+    """
+    Keeps a fixed fraction of root traces (none by default), plus every call
+    that raised or took at least latency_threshold seconds.
+    """
+    TAIL_SAMPLING: ClassVar[bool] = True
+
+    rate: float = 0.0
+    keep_errors: bool = True
+    latency_threshold: Optional[float] = None
+
+    def sample_tail(self, status: str, duration_seconds: float) -> bool:
+        if self.keep_errors and status == "error":
+            return True
+        return self.latency_threshold is not None and duration_seconds >= self.latency_threshold
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Union, Optional
 from datetime import datetime
 
+from impulse_core.templates import EMPTY_TRACE_TEMPLATE # re-exported
+
 class TracedFunctionSchema(BaseModel):
     type: str
     name: str
@@ -20,13 +22,20 @@ class FunctionTimestampsSchema(BaseModel):
     start: datetime
     end: datetime
     start_to_end_seconds: Optional[float] = None
+    start_to_first_chunk_seconds: Optional[float] = None
+    chunk_count: Optional[int] = None
+    inter_chunk_p50_seconds: Optional[float] = None
+    inter_chunk_p90_seconds: Optional[float] = None
+    inter_chunk_p99_seconds: Optional[float] = None
 
 class ContextNodeSchema(BaseModel):
     fn_name: str
     call_id: str
     trace_module: Optional[TraceModuleSchema] = None
+    process_id: Optional[int] = None
 
 class StackTraceSchema(BaseModel):
+    process_id: Optional[int] = None
     parents: List[ContextNodeSchema]
     children: List[ContextNodeSchema] 
 
@@ -34,6 +43,10 @@ class TraceLogSchema(BaseModel):
     timestamp: datetime
     payload: Union[str, Dict[str, Any]]
 
+class TraceSegmentSchema(BaseModel):
+    index: int
+    final: bool
+
 class TraceSchema(BaseModel):
     function: TracedFunctionSchema
     trace_module: TraceModuleSchema
@@ -46,26 +59,4 @@ class TraceSchema(BaseModel):
     stack_trace: Optional[StackTraceSchema] = None
     trace_logs: Optional[List[TraceLogSchema]] = None
     feedback: Optional[Dict[str, Any]] = None
-
-
-EMPTY_TRACE_TEMPLATE = {
-    "function": {
-        "type": "",
-        "name": "",
-        "args": []
-    },
-    "trace_module": {},
-    "call_id": "",
-    "timestamps": {
-        "start": "",
-        "end": "",
-    },
-    "arguments": {},
-    "status": "",
-    "output": "",
-    "stack_trace": {
-        "parents": [],
-        "children": []
-    },
-    "trace_logs": []
-}
\ No newline at end of file
+    segment: Optional[TraceSegmentSchema] = None
@@ -0,0 +1,343 @@
+from __future__ import annotations
+import contextvars
+import hashlib
+import itertools
+import json
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+NO_REPRESENTATION = "No logging representation available."
+JSON_SCALARS = (str, int, float, bool, type(None))
+STANDARD_TYPES = (int, float, str, bool, list, dict, tuple, set, frozenset, type(None))
+
+TRUNCATED_KEY = "__truncated__"
+BUDGET_EXHAUSTED = "...[truncated: record size limit]"
+DIGEST_CHARS = 16
+
+class CircularReference(Exception):
+    pass
+
+@dataclass
+class SizeLimits:
+    """
+    Caps applied while values are serialized. None disables a cap.
+     - Long strings keep a prefix, followed by their full length and a sha256 digest.
+     - Long containers keep their first items, followed by a count of what was dropped.
+     - Containers past max_depth are replaced by a one-line summary.
+    max_string: int     - characters kept from a string
+    max_items: int      - items kept from a list / tuple / set / dict
+    max_depth: int      - nesting depth of containers
+    max_bytes: int      - approximate JSON size of all captured values in one record
+    """
+    max_string: Optional[int] = None
+    max_items: Optional[int] = None
+    max_depth: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ("max_string", "max_items", "max_depth", "max_bytes"):
+            value = getattr(self, name)
+            assert value is None or value >= 0, f"{name} must be non-negative."
+
+class ByteBudget:
+    """
+    Remaining size allowance shared by the values of one record.
+    """
+    __slots__ = ("remaining",)
+
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+
+IMPULSE_RECORD_BUDGET: contextvars.ContextVar[Optional[ByteBudget]] = contextvars.ContextVar("impulse_record_budget", default=None)
+
+class charging:
+    """
+    Context manager charging every value serialized inside it to the same budget.
+    A None budget is a no-op, so callers don't need to branch.
+    """
+    __slots__ = ("budget", "token")
+
+    def __init__(self, budget: Optional[ByteBudget]):
+        self.budget = budget
+        self.token: Optional[contextvars.Token[Optional[ByteBudget]]] = None
+
+    def __enter__(self) -> Optional[ByteBudget]:
+        if self.budget is not None:
+            self.token = IMPULSE_RECORD_BUDGET.set(self.budget)
+        return self.budget
+
+    def __exit__(self, *exc) -> None:
+        if self.token is not None:
+            IMPULSE_RECORD_BUDGET.reset(self.token)
+            self.token = None
+
+@dataclass
+class ImpulseSerializer:
+    """
+    Converts arbitrary python objects into JSON-ready values in a single pass.
+     - Builtin scalars and containers are handled by fast paths keyed on type.
+     - Encoders registered for a class (or any of its bases) take precedence.
+     - Other objects are described by their non-callable attributes, using an
+       attribute list cached per class instead of calling dir() on every item.
+    The output only contains dict / list / str / int / float / bool / None, so
+    loggers can write it with a single json.dumps.
+    With limits set, oversized values are truncated while they are converted
+    (see SizeLimits), so the full copy is never built.
+    """
+    encoders: Dict[type, Callable[[Any], Any]] = field(default_factory=dict)
+    limits: Optional[SizeLimits] = None
+    _dispatch: Dict[type, Optional[Callable[[Any], Any]]] = field(init=False, default_factory=dict)
+    _attr_cache: weakref.WeakKeyDictionary = field(init=False, default_factory=weakref.WeakKeyDictionary)
+
+    def register(self, cls: type, encoder: Callable[[Any], Any]) -> None:
+        """
+        Register an encoder for cls and its subclasses.
+        encoder: Callable   - maps an instance to a JSON-ready value (or anything this serializer accepts)
+        """
+        self.encoders[cls] = encoder
+        self._dispatch.clear()
+
+    def with_limits(self, limits: Optional[SizeLimits]) -> ImpulseSerializer:
+        """
+        A serializer applying different limits, sharing this one's encoders and caches.
+        """
+        other = ImpulseSerializer(encoders = self.encoders, limits = limits)
+        other._dispatch = self._dispatch
+        other._attr_cache = self._attr_cache
+        return other
+
+    def new_budget(self) -> Optional[ByteBudget]:
+        """
+        A fresh per-record budget, or None if there is no record size limit.
+        Use with charging(budget) around everything serialized for the record.
+        """
+        if self.limits is None or self.limits.max_bytes is None:
+            return None
+        return ByteBudget(self.limits.max_bytes)
+
+    def parse(self, item: Any) -> Any:
+        """
+        Parse an argument / output to be logged.
+         - Standard types are conformed to JSON.
+         - Instances and classes are described as {"type", "classname", "attr"}.
+        """
+        cls = type(item)
+        if cls is str or cls is int or cls is float or cls is bool or item is None:
+            return item if self.limits is None else self.conform(item)
+
+        encoder = self._encoder_for(cls)
+        if encoder is not None or isinstance(item, STANDARD_TYPES):
+            return self.conform(item)
+
+        if isinstance(item, type):
+            return {
+                "type": "class",
+                "classname": item.__name__,
+                "attr": self.attributes(item)
+            }
+        return {
+            "type": "instance",
+            "classname": cls.__name__,
+            "attr": self.attributes(item)
+        }
+
+    def conform(self, obj: Any) -> Any:
+        """
+        Convert obj into a JSON-ready value.
+         - Falls back to str(obj) if the value cannot be represented (e.g. cycles).
+        """
+        try:
+            if self.limits is not None:
+                budget = IMPULSE_RECORD_BUDGET.get()
+                if budget is None and self.limits.max_bytes is not None:
+                    budget = ByteBudget(self.limits.max_bytes)
+                return self._convert_limited(obj, set(), 0, budget)
+            return self._convert(obj, set())
+        except (CircularReference, RecursionError):
+            try:
+                return str(obj)
+            except Exception:
+                return NO_REPRESENTATION
+
+    def attributes(self, item: Any) -> Dict[str, Any]:
+        """
+        Non-callable, non-dunder attributes of an instance or class.
+        """
+        names = self._class_attrs(item if isinstance(item, type) else type(item))
+        instance_dict = getattr(item, "__dict__", None)
+        if instance_dict is not None and not isinstance(item, type):
+            names = names + tuple(k for k in instance_dict if k not in names and not k.startswith("__"))
+
+        output = {}
+        for name in names:
+            try:
+                value = getattr(item, name)
+            except Exception:
+                continue
+            if not callable(value):
+                output[name] = self.conform(value)
+        return output
+
+    def _class_attrs(self, cls: type) -> Tuple[str, ...]:
+        try:
+            return self._attr_cache[cls]
+        except KeyError:
+            pass
+        except TypeError:
+            return self._scan_class_attrs(cls)
+
+        names = self._scan_class_attrs(cls)
+        self._attr_cache[cls] = names
+        return names
+
+    @staticmethod
+    def _scan_class_attrs(cls: type) -> Tuple[str, ...]:
+        names = []
+        for name in dir(cls):
+            if name.startswith("__"):
+                continue
+            try:
+                if callable(getattr(cls, name)):
+                    continue
+            except Exception:
+                pass
+            names.append(name)
+        return tuple(names)
+
+    def _encoder_for(self, cls: type) -> Optional[Callable[[Any], Any]]:
+        try:
+            return self._dispatch[cls]
+        except KeyError:
+            pass
+
+        encoder = None
+        if self.encoders:
+            for base in cls.__mro__:
+                if base in self.encoders:
+                    encoder = self.encoders[base]
+                    break
+        self._dispatch[cls] = encoder
+        return encoder
+
+    def _convert(self, obj: Any, active: Set[int]) -> Any:
+        cls = type(obj)
+        if cls is str or cls is int or cls is float or cls is bool or obj is None:
+            return obj
+
+        encoder = self._encoder_for(cls)
+        if encoder is not None:
+            return self._convert(encoder(obj), active)
+
+        if cls is dict or cls is list or cls is tuple or isinstance(obj, (dict, list, tuple, set, frozenset)):
+            marker = id(obj)
+            if marker in active:
+                raise CircularReference()
+            active.add(marker)
+            try:
+                if isinstance(obj, dict):
+                    return {
+                        k if type(k) is str else self._convert_key(k): self._convert(v, active)
+                        for k, v in obj.items()
+                    }
+                return [self._convert(v, active) for v in obj]
+            finally:
+                active.discard(marker)
+
+        if isinstance(obj, JSON_SCALARS):
+            return obj
+
+        try:
+            return str(obj)
+        except Exception:
+            return NO_REPRESENTATION
+
+    def _convert_limited(self, 
+                         obj: Any, 
+                         active: Set[int], 
+                         depth: int, 
+                         budget: Optional[ByteBudget]) -> Any:
+        if budget is not None and budget.remaining <= 0:
+            return BUDGET_EXHAUSTED
+
+        cls = type(obj)
+        if cls is str:
+            return self._truncate_str(obj, budget)
+        if cls is int or cls is float or cls is bool or obj is None:
+            if budget is not None:
+                budget.remaining -= 8
+            return obj
+
+        encoder = self._encoder_for(cls)
+        if encoder is not None:
+            return self._convert_limited(encoder(obj), active, depth, budget)
+
+        if isinstance(obj, (dict, list, tuple, set, frozenset)):
+            limits = self.limits
+            assert limits is not None
+            size = len(obj)
+            if limits.max_depth is not None and depth >= limits.max_depth:
+                summary = f"...[truncated: {cls.__name__} of {size} items]"
+                if budget is not None:
+                    budget.remaining -= len(summary) + 2
+                return summary
+
+            marker = id(obj)
+            if marker in active:
+                raise CircularReference()
+            active.add(marker)
+            try:
+                keep = size if limits.max_items is None else min(size, limits.max_items)
+                if isinstance(obj, dict):
+                    entries: Dict[str, Any] = {}
+                    for k, v in itertools.islice(obj.items(), keep):
+                        key = k if type(k) is str else self._convert_key(k)
+                        if budget is not None:
+                            budget.remaining -= len(key) + 4
+                        entries[key] = self._convert_limited(v, active, depth + 1, budget)
+                    if keep < size:
+                        entries[TRUNCATED_KEY] = f"{size - keep} of {size} items"
+                    return entries
+
+                items = [self._convert_limited(v, active, depth + 1, budget) for v in itertools.islice(obj, keep)]
+                if keep < size:
+                    items.append(f"...[truncated {size - keep} of {size} items]")
+                return items
+            finally:
+                active.discard(marker)
+
+        if isinstance(obj, JSON_SCALARS):
+            return obj
+
+        try:
+            return self._truncate_str(str(obj), budget)
+        except Exception:
+            return NO_REPRESENTATION
+
+    def _truncate_str(self, value: str, budget: Optional[ByteBudget]) -> str:
+        limits = self.limits
+        assert limits is not None
+        limit = limits.max_string
+        if budget is not None and (limit is None or budget.remaining < limit):
+            limit = max(budget.remaining, 0)
+
+        if limit is None or len(value) <= limit:
+            if budget is not None:
+                budget.remaining -= len(value) + 2
+            return value
+
+        digest = hashlib.sha256(value.encode("utf-8", errors="surrogatepass")).hexdigest()[:DIGEST_CHARS]
+        output = f"{value[:limit]}...[truncated {len(value)} chars, sha256:{digest}]"
+        if budget is not None:
+            budget.remaining -= len(output) + 2
+        return output
+
+    @staticmethod
+    def _convert_key(key: Any) -> str:
+        if isinstance(key, str):
+            return key
+        if isinstance(key, (int, float, bool)) or key is None:
+            return json.dumps(key)
+        return str(key)
+
+DEFAULT_SERIALIZER = ImpulseSerializer()
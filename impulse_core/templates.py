@@ -0,0 +1,27 @@
+from typing import Any, Dict
+
+## Kept free of dependencies, so the tracer, the schemas and the tree builder 
+## can import it without loading each other (or pydantic).
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+EMPTY_TRACE_TEMPLATE: Dict[str, Any] = {
+    "function": {
+        "type": "",
+        "name": "",
+        "args": []
+    },
+    "trace_module": {},
+    "call_id": "",
+    "timestamps": {
+        "start": "",
+        "end": "",
+    },
+    "arguments": {},
+    "status": "",
+    "output": "",
+    "stack_trace": {
+        "parents": [],
+        "children": []
+    },
+    "trace_logs": []
+}
@@ -5,48 +5,115 @@ import inspect
 import json, os, sys, time, uuid
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Any, AsyncGenerator, Dict, List, Optional, Union, Callable, Tuple
+from typing import Any, AsyncGenerator, Dict, FrozenSet, List, Optional, Union, Callable, Tuple, cast
 from enum import Enum
 import asyncio
 import functools as ft, hashlib
+import random, threading
+from array import array
 
-from impulse_core.logger import BaseAsyncLogger, LocalLogger, MongoLogger
-from impulse_core.schema import TraceSchema, EMPTY_TRACE_TEMPLATE
+from impulse_core.logger import BaseAsyncLogger, BaseAsyncioLogger, LocalLogger, MongoLogger, STREAM_SOURCE
+from impulse_core.serializer import ByteBudget, ImpulseSerializer, SizeLimits, DEFAULT_SERIALIZER, STANDARD_TYPES, charging
+from impulse_core.sampling import BaseSampler
+from impulse_core.metrics import HookMetrics, LatencyHistogram
+from impulse_core.templates import EMPTY_TRACE_TEMPLATE, TIMESTAMP_FORMAT
+
+VALIDATION_ALWAYS = "always"
+VALIDATION_SAMPLED = "sampled"
+VALIDATION_DEFERRED = "deferred"
+VALIDATION_OFF = "off"
+VALIDATION_MODES = (VALIDATION_ALWAYS, VALIDATION_SAMPLED, VALIDATION_DEFERRED, VALIDATION_OFF)
+
+CAPTURE_FULL = "full"
+CAPTURE_METRICS = "metrics"
+CAPTURE_LEVELS = (CAPTURE_FULL, CAPTURE_METRICS)
+
+_TIMESTAMP_PREFIX_CACHE: Tuple[int, str] = (-1, "")
+
+def format_timestamp(time_ns: int) -> str:
+    """
+    Render a time.time_ns() value as local time in TIMESTAMP_FORMAT.
+    The "%Y-%m-%d %H:%M:%S" prefix is cached per second, so rendering a
+    burst of timestamps costs one strftime per distinct second.
+    """
+    global _TIMESTAMP_PREFIX_CACHE
+    seconds, nanos = divmod(time_ns, 1_000_000_000)
+    cached_seconds, prefix = _TIMESTAMP_PREFIX_CACHE
+    if seconds != cached_seconds:
+        prefix = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
+        _TIMESTAMP_PREFIX_CACHE = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}"
+
+IMPULSE_PROCESS_ID: int = os.getpid()
 
-@dataclass
 class ImpulseTraceNode:
-    
-    name: str
-    call_id: str
-    trace_module: Optional[Dict[str, Any]]
-    creation_time: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-    parents: List[ImpulseTraceNode] = field(default_factory=list)
-    children: List[ImpulseTraceNode] = field(default_factory=list)
-    trace_logs: List[Dict[str, Any]] = field(default_factory=list)
-    diff_process: bool = False
+    """
+    A traced call in the context tree.
+     - Identity semantics: nodes compare and hash by object, never by contents.
+     - children is keyed by call_id, so parent-child membership checks are O(1).
+     - A node drops its references to its children once it has been exported.
+     - process_id is the process the call runs in. A node from another process 
+       (inherited through fork, or attached with attach_trace_context()) only 
+       acts as a parent: the link is recorded on the child's side, and the 
+       node itself never collects children.
+    """
+    __slots__ = ("name", "call_id", "trace_module", "creation_time", "creation_perf", 
+                 "parents", "children", "trace_logs", "process_id", 
+                 "sampled", "recorded", "completed", "exported", "__weakref__")
+
+    def __init__(self,
+                 name: str,
+                 call_id: str,
+                 trace_module: Optional[Dict[str, Any]],
+                 creation_time: Optional[int] = None,
+                 creation_perf: Optional[int] = None,
+                 sampled: bool = True,
+                 process_id: Optional[int] = None):
+        self.name = name
+        self.call_id = call_id
+        self.trace_module = trace_module
+        self.creation_time: int = time.time_ns() if creation_time is None else creation_time
+        self.creation_perf: int = time.perf_counter_ns() if creation_perf is None else creation_perf
+        self.parents: List[ImpulseTraceNode] = []
+        self.children: Dict[str, ImpulseTraceNode] = {}
+        self.trace_logs: List[Dict[str, Any]] = []
+        self.process_id: int = IMPULSE_PROCESS_ID if process_id is None else process_id
+        self.sampled: bool = sampled
+        self.recorded: bool = True
+        self.completed: bool = False
+        self.exported: bool = False
+
+    def __repr__(self) -> str:
+        return f"ImpulseTraceNode(name={self.name!r}, call_id={self.call_id!r}, children={len(self.children)})"
 
     def add_child(self, child_node: ImpulseTraceNode):
-        self.children.append(child_node)
+        if self.process_id == IMPULSE_PROCESS_ID:
+            self.children[child_node.call_id] = child_node
         child_node.parents.append(self)
 
     def export(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        output = {
+            "process_id": self.process_id,
+            "parents": [parent.export_node() for parent in self.parents],
+            "children": [child.export_node() for child in self.children.values() if child.recorded]
+        }, self.export_logs()
 
-        # Handles multiprocessing
-        for parent in self.parents:
-            if self not in parent.children:
-                self.diff_process = True
-                parent.children.append(self)
+        self.exported = True
+        self.children = {}
+        return output
 
-        return {
-            "parents": [parent.export_node() for parent in self.parents],
-            "children": [child.export_node() for child in self.children]
-        }, self.trace_logs
+    def export_logs(self) -> List[Dict[str, Any]]:
+        return [
+            {"timestamp": format_timestamp(log["timestamp"]), "payload": log["payload"]}
+            for log in self.trace_logs
+        ]
 
     def export_node(self) -> Dict[str, Any]:
         return {
             "fn_name": self.name,
             "call_id": self.call_id,
             "trace_module": self.trace_module,
+            "process_id": self.process_id
         }
 
 curr_frame = inspect.currentframe()
@@ -58,18 +125,79 @@ else:
 IMPULSE_GLOBAL_ROOT = ImpulseTraceNode(
     name = root_name,
     call_id = str(uuid.uuid4()),
-    creation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
     trace_module = None
 )
 IMPULSE_CURRENT_TRACE_ROOT: cv.ContextVar[ImpulseTraceNode] = cv.ContextVar("IMPULSE_CURRENT_TRACE_ROOT", default=IMPULSE_GLOBAL_ROOT)
 
+# The global root is written out in segments; completed children are released after each one.
+# Each tracer writes the segments of its own root-level calls; the index is shared so they stay distinct.
+IMPULSE_GLOBAL_ROOT_LOCK = threading.Lock()
+IMPULSE_GLOBAL_ROOT_SEGMENT: Dict[str, int] = {"index": 0}
+
+def _reset_after_fork() -> None:
+    """
+    A forked child gets its own global root (new call_id, no children) and lock.
+    Nodes inherited from the parent process keep their process_id, so they 
+    stay parents of the child's calls without collecting them.
+    """
+    global IMPULSE_PROCESS_ID, IMPULSE_GLOBAL_ROOT_LOCK
+    IMPULSE_PROCESS_ID = os.getpid()
+    IMPULSE_GLOBAL_ROOT_LOCK = threading.Lock()
+
+    root = IMPULSE_GLOBAL_ROOT
+    root.call_id = str(uuid.uuid4())
+    root.process_id = IMPULSE_PROCESS_ID
+    root.children = {}
+    root.trace_logs = []
+    root.creation_time, root.creation_perf = time.time_ns(), time.perf_counter_ns()
+    IMPULSE_GLOBAL_ROOT_SEGMENT["index"] = 0
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child = _reset_after_fork)
+
+def current_trace_context() -> Optional[Dict[str, Any]]:
+    """
+    A picklable reference to the current traced call, to hand to another process 
+    (e.g. as a task argument). Returns None outside of a traced call.
+    """
+    curr_root = IMPULSE_CURRENT_TRACE_ROOT.get()
+    if curr_root is IMPULSE_GLOBAL_ROOT:
+        return None
+    return curr_root.export_node()
+
+@contextmanager
+def attach_trace_context(context: Optional[Dict[str, Any]]):
+    """
+    Make the call described by context (see current_trace_context()) the parent 
+    of the calls traced inside this block, typically in a worker process.
+    """
+    if context is None:
+        yield
+        return
+
+    remote = ImpulseTraceNode(
+        name = context["fn_name"],
+        call_id = context["call_id"],
+        trace_module = context.get("trace_module"),
+        process_id = context.get("process_id", -1)
+    )
+    remote.exported = True
+    token = IMPULSE_CURRENT_TRACE_ROOT.set(remote)
+    try:
+        yield
+    finally:
+        IMPULSE_CURRENT_TRACE_ROOT.reset(token)
+
 @contextmanager
 def impulse_trace_context(new_root: ImpulseTraceNode):
     """
     Context manager for tracing.
     """
     old_root: ImpulseTraceNode = IMPULSE_CURRENT_TRACE_ROOT.get()
-    if old_root is not None:
+    if old_root is IMPULSE_GLOBAL_ROOT:
+        with IMPULSE_GLOBAL_ROOT_LOCK:
+            old_root.add_child(new_root)
+    elif old_root is not None:
         old_root.add_child(new_root)
     IMPULSE_CURRENT_TRACE_ROOT.set(new_root)
     try:
@@ -83,7 +211,7 @@ def trace_log(payload: Union[str, Dict[str, Any]], printout: bool = True):
     """
     Log payload into the trace context
     """
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    now = time.time_ns()
     curr_root = IMPULSE_CURRENT_TRACE_ROOT.get()
     if curr_root is not None:
         curr_root.trace_logs.append({
@@ -94,35 +222,299 @@ def trace_log(payload: Union[str, Dict[str, Any]], printout: bool = True):
         raise Exception("No trace context available.")
     
     if printout:
-        print(f"[TRACE LOG] {curr_root.name}() @ {now} : {payload}")
+        print(f"[TRACE LOG] {curr_root.name}() @ {format_timestamp(now)} : {payload}")
 
 
-STANDARD_TYPES = (int, float, str, bool, list, dict, tuple, set, frozenset, type(None))
-
 def conform_output(obj: Any) -> Union[str,Dict[str, Any]]:
-    try:
-        json.dumps(obj)
-        return obj
-    except:
-        try:
-            return str(obj)
-        except:
-            return "No logging representation available."
+    return DEFAULT_SERIALIZER.conform(obj)
+
+class ImpulseCallRecord:
+    """
+    Trace record for a single call of a hook.
+    The function / trace_module parts are built once per hook and shared by 
+    reference; only the per-call fields live on the record.
+    """
+    __slots__ = ("function", "trace_module", "call_id", "timestamps", "arguments", 
+                 "status", "exception", "output", "stack_trace", "trace_logs", "budget")
+
+    def __init__(self, 
+                 function: Dict[str, Any], 
+                 trace_module: Dict[str, Any], 
+                 call_id: str):
+        self.function = function
+        self.trace_module = trace_module
+        self.call_id = call_id
+        self.timestamps: Dict[str, Any] = {}
+        self.arguments: Dict[str, Any] = {}
+        self.status: Optional[str] = None
+        self.exception: Optional[str] = None
+        self.output: Any = None
+        self.stack_trace: Optional[Dict[str, Any]] = None
+        self.trace_logs: List[Dict[str, Any]] = []
+        self.budget: Optional[ByteBudget] = None
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "function": self.function,
+            "trace_module": self.trace_module,
+            "call_id": self.call_id,
+            "timestamps": self.timestamps,
+            "arguments": self.arguments,
+            "status": self.status,
+            "exception": self.exception,
+            "output": self.output,
+            "stack_trace": self.stack_trace,
+            "trace_logs": self.trace_logs
+        }
+
+class StreamCapture:
+    """
+    Streamed output of one call. Chunks are buffered up to batch_bytes and each
+    batch is logged as its own record, tagged with the call_id and a sequence 
+    number; the last one is marked final. Readers join them with join_streams.
+    """
+    __slots__ = ("logger", "metadata", "max_bytes", "batch_bytes", "captured", "pending", "pending_bytes", "seq")
+
+    def __init__(self, 
+                 logger: Any, 
+                 metadata: Dict[str, Any], 
+                 max_bytes: int, 
+                 batch_bytes: int):
+        self.logger = logger
+        self.metadata = metadata
+        self.max_bytes = max_bytes
+        self.batch_bytes = batch_bytes
+        self.captured: int = 0
+        self.pending: List[str] = []
+        self.pending_bytes: int = 0
+        self.seq: int = 0
+
+    def feed(self, data: str) -> None:
+        """
+        Buffer a chunk, truncating at max_bytes (utf-8), and log the batch once it is full.
+        """
+        encoded = data.encode("utf-8")
+        size = len(encoded)
+        if self.captured < self.max_bytes:
+            kept = size
+            if self.captured + size > self.max_bytes:
+                kept = self.max_bytes - self.captured
+                data = encoded[:kept].decode("utf-8", errors="ignore")
+            self.pending.append(data)
+            self.pending_bytes += kept
+            if self.pending_bytes >= self.batch_bytes:
+                self.flush()
+        self.captured += size
+
+    @property
+    def full(self) -> bool:
+        return self.captured >= self.max_bytes
+
+    def skip(self) -> None:
+        """
+        Count a chunk arriving after max_bytes without encoding it.
+        """
+        self.captured = max(self.captured, self.max_bytes + 1)
+
+    def flush(self, final: bool = False) -> None:
+        if len(self.pending) == 0 and not final:
+            return
+        self.logger.log(payload = "".join(self.pending), 
+                        metadata = {**self.metadata, "seq": self.seq, "final": final})
+        self.pending = []
+        self.pending_bytes = 0
+        self.seq += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "streamed": True,
+            "captured_bytes": min(self.captured, self.max_bytes),
+            "truncated": self.captured > self.max_bytes
+        }
+
+PLAN_CACHEABLE_DEFAULTS = (int, float, str, bool, type(None))
+
+@dataclass
+class CallPlan:
+    """
+    Binding plan for a hooked function, compiled once at decoration time.
+    The per-call path walks the positional args / kwargs against the cached
+    parameter layout instead of calling inspect.signature() and sig.bind().
+    Anything unusual (bad arity, duplicate or unknown kwargs) falls back to
+    sig.bind(), which raises the same TypeError the function would.
+    """
+    signature: inspect.Signature
+    names: Tuple[str, ...]
+    positional: Tuple[str, ...]
+    keyword: FrozenSet[str]
+    defaults: Dict[str, Any]
+    serializers: Dict[str, Callable[[Any], Any]]
+    serialized_defaults: Dict[str, Any] = field(default_factory=dict)
+    var_positional: Optional[str] = None
+    var_keyword: Optional[str] = None
+
+    @classmethod
+    def compile(cls, 
+                func: Callable, 
+                serializer: Callable[[Any], Any],
+                overrides: Optional[Dict[str, Callable[[Any], Any]]] = None) -> CallPlan:
+        """
+        Build the plan for func.
+        serializer: Callable    - default serializer for every parameter
+        overrides: Dict         - optional per-parameter serializers
+        """
+        sig = inspect.signature(func)
+        overrides = overrides or {}
+
+        names: List[str] = []
+        positional: List[str] = []
+        keyword: List[str] = []
+        defaults: Dict[str, Any] = {}
+        var_positional = var_keyword = None
+
+        for name, param in sig.parameters.items():
+            names.append(name)
+            if param.kind == param.VAR_POSITIONAL:
+                var_positional = name
+                continue
+            if param.kind == param.VAR_KEYWORD:
+                var_keyword = name
+                continue
+            if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+                positional.append(name)
+            if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY):
+                keyword.append(name)
+            if param.default is not param.empty:
+                defaults[name] = param.default
+
+        serializers = {name: overrides.get(name, serializer) for name in names}
+        serialized_defaults = {
+            name: serializers[name](value)
+            for name, value in defaults.items()
+            if isinstance(value, PLAN_CACHEABLE_DEFAULTS)
+        }
+
+        return cls(
+            signature = sig,
+            names = tuple(names),
+            positional = tuple(positional),
+            keyword = frozenset(keyword),
+            defaults = defaults,
+            serializers = serializers,
+            serialized_defaults = serialized_defaults,
+            var_positional = var_positional,
+            var_keyword = var_keyword
+        )
+
+    def bind(self, 
+             args: Tuple[Any, ...], 
+             kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map the call arguments onto parameter names, in signature order,
+        with defaults applied. Equivalent to sig.bind(...).apply_defaults().
+        """
+        n_args = len(args)
+        n_positional = len(self.positional)
+
+        # Common case: everything passed positionally, nothing variadic
+        if not kwargs and n_args == len(self.names) and n_args == n_positional:
+            return dict(zip(self.names, args))
+
+        if n_args > n_positional and self.var_positional is None:
+            return self._slow_bind(args, kwargs)
+
+        given = dict(zip(self.positional, args))
+        extra: Dict[str, Any] = {}
+        for k, v in kwargs.items():
+            if k in self.keyword and k not in given:
+                given[k] = v
+            elif self.var_keyword is not None and k not in self.signature.parameters:
+                extra[k] = v
+            else:
+                return self._slow_bind(args, kwargs)
+
+        bound: Dict[str, Any] = {}
+        for name in self.names:
+            if name in given:
+                bound[name] = given[name]
+            elif name == self.var_positional:
+                bound[name] = args[n_positional:]
+            elif name == self.var_keyword:
+                bound[name] = extra
+            elif name in self.defaults:
+                bound[name] = self.defaults[name]
+            else:
+                return self._slow_bind(args, kwargs)
+        return bound
+
+    def _slow_bind(self, 
+                   args: Tuple[Any, ...], 
+                   kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        bound_args: inspect.BoundArguments = self.signature.bind(*args, **kwargs)
+        bound_args.apply_defaults()
+        return dict(bound_args.arguments)
+
+    def process(self, 
+                args: Tuple[Any, ...], 
+                kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Bind and serialize the call arguments in a single walk.
+        """
+        serializers = self.serializers
+        cached = self.serialized_defaults
+        defaults = self.defaults
+        return {
+            k: cached[k] if k in cached and v is defaults[k] else serializers[k](v)
+            for k, v in self.bind(args, kwargs).items()
+        }
 
 @dataclass
 class ImpulseTracer:
 
-    logger: BaseAsyncLogger = field(default_factory=LocalLogger)
+    logger: Union[BaseAsyncLogger, BaseAsyncioLogger] = field(default_factory=LocalLogger)
     metadata: Dict[str, Any] = field(default_factory=dict)
     instance_id: Optional[str] = None
     session_id: Optional[str] = None
     session_metadata: Optional[Dict[str, Any]] = None
+    serializer: ImpulseSerializer = field(default_factory=ImpulseSerializer)
+    sampler: Optional[BaseSampler] = None
+    thread_samplers: Dict[str, BaseSampler] = field(default_factory=dict)
+    validation: str = VALIDATION_ALWAYS
+    validation_rate: float = 0.01
+    root_segment_size: Optional[int] = 10000
+    root_segment_interval: Optional[float] = None
+    limits: Optional[SizeLimits] = None
+    capture: str = CAPTURE_FULL
+    collect_metrics: bool = True
+    metrics_interval_s: Optional[float] = None
 
     def __post_init__(self):
+        assert self.validation in VALIDATION_MODES, f"Unknown validation mode {self.validation}."
+        assert self.capture in CAPTURE_LEVELS, f"Unknown capture level {self.capture}."
+        if self.limits is not None:
+            self.serializer = self.serializer.with_limits(self.limits)
         if self.instance_id is None:
             self.instance_id = "impulse_module_"+str(uuid.uuid4())[:8]
         if self.session_id is None:
             self.session_id = "run_" + datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
+        self._stats: Dict[str, int] = {"validated": 0, "validation_failures": 0}
+        self._stats_lock = threading.Lock()
+        self.last_validation_error: Optional[str] = None
+
+        self._root_completed: int = 0
+        self._root_segment_start: Tuple[int, int] = (IMPULSE_GLOBAL_ROOT.creation_time, IMPULSE_GLOBAL_ROOT.creation_perf)
+        self._segment_due = threading.Event()
+        self._stop_segments = threading.Event()
+        self._segment_writer: Optional[threading.Thread] = None
+
+        self._metrics = HookMetrics()
+        self._stop_metrics = threading.Event()
+        self._metrics_dumper: Optional[threading.Thread] = None
+        if self.metrics_interval_s is not None:
+            self._metrics_dumper = threading.Thread(target = self._dump_metrics_periodically, 
+                                                    name = "impulse-metrics", 
+                                                    daemon = True)
+            self._metrics_dumper.start()
 
     def set_session_id(self, session_id: str, session_metadata: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -131,11 +523,29 @@ class ImpulseTracer:
         self.session_id = session_id
         self.session_metadata = session_metadata
 
+    def set_sampler(self, sampler: Optional[BaseSampler], thread_id: Optional[str] = None) -> None:
+        """
+        Set the sampling policy for the tracer, or for a single thread if thread_id is given.
+        Hook-level samplers (hook(sampler=...)) take precedence over both.
+        """
+        if thread_id is None:
+            self.sampler = sampler
+        elif sampler is None:
+            self.thread_samplers.pop(thread_id, None)
+        else:
+            self.thread_samplers[thread_id] = sampler
+
     def hook(self,
             thread_id: str = "default", 
             hook_id: Optional[str] = None,
             hook_metadata: Dict[str, Any] = {},
-            output_postprocess: Optional[Callable] = None) -> Callable:
+            output_postprocess: Optional[Callable] = None,
+            sampler: Optional[BaseSampler] = None,
+            stream_output: bool = False,
+            stream_max_bytes: int = 1024 * 1024,
+            stream_batch_bytes: int = 16 * 1024,
+            limits: Optional[SizeLimits] = None,
+            capture: Optional[str] = None) -> Callable:
 
         def decorator(func: Callable) -> Callable:
             """
@@ -157,6 +567,17 @@ class ImpulseTracer:
             IS_COROUTINE = inspect.iscoroutinefunction(func) 
             IS_ASYNCGEN = inspect.isasyncgenfunction(func) 
 
+            level = self.capture if capture is None else capture
+            assert level in CAPTURE_LEVELS, f"Unknown capture level {level}."
+            hist: Optional[LatencyHistogram] = None
+            if self.collect_metrics or level == CAPTURE_METRICS:
+                hist = self._metrics.histogram(thread_id, hook_id)
+            if level == CAPTURE_METRICS:
+                return self._metrics_wrapper(func, cast(LatencyHistogram, hist), IS_COROUTINE, IS_ASYNCGEN)
+
+            serializer = self.serializer if limits is None else self.serializer.with_limits(limits)
+            plan: CallPlan = CallPlan.compile(func, serializer.parse)
+
             trace_output: dict = {}
             trace_output["function"] = {
                 "type": "Coroutine" if IS_COROUTINE else "AsyncGenerator" if IS_ASYNCGEN else "Function",
@@ -173,50 +594,108 @@ class ImpulseTracer:
                 "hook_metadata": hook_metadata
             }
 
-            def trace_init(*args, **kwargs) -> ImpulseTraceNode:
-                trace_output.update({
-                    **self._initialize_call(),
-                    **self._get_time("start"),
-                    **self._process_inputs(inspect.signature(func), args, kwargs)
-                })
+            def trace_init(args: Tuple[Any, ...], 
+                           kwargs: Dict[str, Any]) -> Tuple[ImpulseTraceNode, ImpulseCallRecord]:
+                call_sampler = self._get_sampler(thread_id, sampler)
+                sampled = self._sample_head(call_sampler, trace_output["trace_module"])
+                record = ImpulseCallRecord(
+                    function = trace_output["function"], 
+                    trace_module = trace_output["trace_module"], 
+                    **self._initialize_call()
+                )
+                if sampled:
+                    record.budget = serializer.new_budget()
+                    with charging(record.budget):
+                        record.arguments = self._process_inputs(plan, args, kwargs)
                 new_root = ImpulseTraceNode(
                     name = f_name,
-                    call_id = trace_output["call_id"],
-                    creation_time=trace_output["timestamps"]["start"],
-                    trace_module = trace_output["trace_module"]
+                    call_id = record.call_id,
+                    trace_module = record.trace_module,
+                    sampled = sampled
                 )
-                return new_root
+                return new_root, record
+
+            def trace_finish(new_root: ImpulseTraceNode, 
+                             record: ImpulseCallRecord,
+                             args: Tuple[Any, ...], 
+                             kwargs: Dict[str, Any],
+                             output: Any,
+                             chunk_times: Optional[array] = None) -> Optional[Dict[str, Any]]:
+                """
+                Complete the record; returns its payload, or None if the call is not recorded.
+                """
+                duration_ns = time.perf_counter_ns() - new_root.creation_perf
+                if hist is not None:
+                    hist.record(duration_ns, record.status == "error")
+                if not new_root.sampled:
+                    call_sampler = self._get_sampler(thread_id, sampler)
+                    if not self._sample_tail(call_sampler, record.status or "", duration_ns):
+                        new_root.recorded = False
+                        return None
+                    record.budget = serializer.new_budget()
+                    with charging(record.budget):
+                        record.arguments = self._process_inputs(plan, args, kwargs)
 
-            def trace_complete(new_root: ImpulseTraceNode) -> None:
-                trace_output.update(self._get_time("end", trace_output["timestamps"], delta_to="start"))
-                trace_output["stack_trace"], trace_output["trace_logs"] = new_root.export() 
-                self._write(payload=trace_output)
+                record.timestamps = self._get_timestamps(new_root.creation_time, duration_ns)
+                if chunk_times is not None:
+                    record.timestamps.update(self._get_chunk_timestamps(new_root.creation_perf, chunk_times))
+                with charging(record.budget):
+                    record.output = self._parse_item(output, serializer)
+                record.stack_trace, record.trace_logs = new_root.export() 
+                return record.to_payload()
+
+            def trace_complete(new_root: ImpulseTraceNode, 
+                               record: ImpulseCallRecord,
+                               args: Tuple[Any, ...], 
+                               kwargs: Dict[str, Any],
+                               output: Any,
+                               chunk_times: Optional[array] = None) -> None:
+                payload = trace_finish(new_root, record, args, kwargs, output, chunk_times)
+                if payload is not None:
+                    self._write(payload = payload)
+                self._release(new_root)
+
+            async def trace_acomplete(new_root: ImpulseTraceNode, 
+                                      record: ImpulseCallRecord,
+                                      args: Tuple[Any, ...], 
+                                      kwargs: Dict[str, Any],
+                                      output: Any,
+                                      chunk_times: Optional[array] = None) -> None:
+                """
+                trace_complete for coroutine hooks: asyncio-native loggers are 
+                written to on the event loop, through alog().
+                """
+                if not isinstance(self.logger, BaseAsyncioLogger):
+                    return trace_complete(new_root, record, args, kwargs, output, chunk_times)
+
+                payload = trace_finish(new_root, record, args, kwargs, output, chunk_times)
+                if payload is not None:
+                    await self._awrite(payload = payload)
+                self._release(new_root)
 
             @ft.wraps(func)
             async def coro_wrapper(*args, **kwargs):
                 """
                 Asynchronous coroutine wrapper.
                 """
-                new_root = trace_init(*args, **kwargs)
+                new_root, record = trace_init(args, kwargs)
                 
                 try:
                     output = None
                     with impulse_trace_context(new_root):
                         output = await func(*args, **kwargs)
                     
-                    trace_output["status"] = "success"
+                    record.status = "success"
 
                     if output_postprocess is not None:
                         output = output_postprocess(output)
 
-                    trace_output["output"] = self._parse_item(output)
-
                 except Exception as e:
-                    trace_output["status"] = "error"
-                    self._handle_exception(e, trace_output)
+                    record.status = "error"
+                    self._handle_exception(e, record)
 
                 finally:
-                    trace_complete(new_root)
+                    await trace_acomplete(new_root, record, args, kwargs, output)
 
                 return output
             
@@ -224,57 +703,77 @@ class ImpulseTracer:
             async def agen_wrapper(*args, **kwargs):
                 """
                 Asynchronous generator wrapper.
+                 - If the generator is closed early (aclose() or cancellation), the record is 
+                   marked "cancelled" and queued without waiting (dropped if the queue is full).
+                 - With stream_output, chunks are logged in batches of about stream_batch_bytes
+                   as they arrive (up to stream_max_bytes) instead of being collected for the record.
                 """
-                new_root = trace_init(*args, **kwargs)
+                new_root, record = trace_init(args, kwargs)
+                chunk_times = array("q")
+                stream: Optional[StreamCapture] = None
+                if stream_output and new_root.sampled:
+                    stream = self._open_stream(record, stream_max_bytes, stream_batch_bytes)
 
                 try:
-                    output = []
+                    output: Any = []
                     with impulse_trace_context(new_root):
                         async for chunk in func(*args, **kwargs):
+                            chunk_times.append(time.perf_counter_ns())
+                            if stream is not None:
+                                self._feed_stream(stream, chunk, serializer)
+                            else:
+                                output.append(chunk)
                             yield chunk
-                            output.append(chunk)
-                    
-                    if all([isinstance(output[i], str) for i in range(len(output))]):
-                        output = "".join(output)
+
+                    if stream is not None:
+                        output = stream.summary()
+                    else:
+                        if all([isinstance(output[i], str) for i in range(len(output))]):
+                            output = "".join(output)
                     
-                    if output_postprocess is not None:
-                        output = output_postprocess(output)
+                        if output_postprocess is not None:
+                            output = output_postprocess(output)
 
-                    trace_output["status"] = "success"
-                    trace_output["output"] = self._parse_item(output)
+                    record.status = "success"
 
                 except Exception as e:
-                    trace_output["status"] = "error"
-                    trace_output["output"] = output
-                    self._handle_exception(e, trace_output)
+                    record.status = "error"
+                    self._handle_exception(e, record)
+
+                except (GeneratorExit, asyncio.CancelledError):
+                    record.status = "cancelled"
+                    raise
                 
                 finally:
-                    trace_complete(new_root)
+                    if stream is not None:
+                        stream.flush(final = True)
+                    if record.status == "cancelled": ## closed early: must not suspend, so no alog()
+                        trace_complete(new_root, record, args, kwargs, output, chunk_times)
+                    else:
+                        await trace_acomplete(new_root, record, args, kwargs, output, chunk_times)
 
             @ft.wraps(func)
             def wrapper(*args, **kwargs):
                 """
                 Synchronous function call wrappers.
                 """
-                new_root = trace_init(*args, **kwargs)
+                new_root, record = trace_init(args, kwargs)
                 
                 try:
                     output = None
                     with impulse_trace_context(new_root):
                         output = func(*args, **kwargs)
 
-                    trace_output["status"] = "success"
+                    record.status = "success"
                     if output_postprocess is not None:
                         output = output_postprocess(output)
-                        
-                    trace_output["output"] = self._parse_item(output)
                     
                 except Exception as e:
-                    trace_output["status"] = "error"
-                    self._handle_exception(e, trace_output)
+                    record.status = "error"
+                    self._handle_exception(e, record)
                 
                 finally:
-                    trace_complete(new_root)
+                    trace_complete(new_root, record, args, kwargs, output)
 
                 return output
 
@@ -287,6 +786,88 @@ class ImpulseTracer:
             
         return decorator
 
+    def _metrics_wrapper(self, 
+                         func: Callable, 
+                         hist: LatencyHistogram, 
+                         is_coroutine: bool, 
+                         is_asyncgen: bool) -> Callable:
+        """
+        Wrapper for the "metrics" capture level: times the call into the hook's 
+        histogram and nothing else. No record, trace node or serialization, so 
+        hooked calls inside it attach to the nearest fully traced caller.
+        """
+        perf_counter_ns = time.perf_counter_ns
+
+        @ft.wraps(func)
+        async def coro_wrapper(*args, **kwargs):
+            start, error = perf_counter_ns(), False
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                hist.record(perf_counter_ns() - start, error)
+
+        @ft.wraps(func)
+        async def agen_wrapper(*args, **kwargs):
+            start, error = perf_counter_ns(), False
+            try:
+                async for chunk in func(*args, **kwargs):
+                    yield chunk
+            except Exception:
+                error = True
+                raise
+            finally:
+                hist.record(perf_counter_ns() - start, error)
+
+        @ft.wraps(func)
+        def wrapper(*args, **kwargs):
+            start, error = perf_counter_ns(), False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                hist.record(perf_counter_ns() - start, error)
+
+        if is_coroutine:
+            return coro_wrapper
+        elif is_asyncgen:
+            return agen_wrapper
+        return wrapper
+
+    def metrics(self, reset: bool = False) -> List[Dict[str, Any]]:
+        """
+        Per-hook call / error counts and p50 / p90 / p99 / max latencies (seconds).
+        reset: bool     - start a new measurement window after reading
+        """
+        return self._metrics.snapshot(reset = reset)
+
+    def dump_metrics(self, reset: bool = True) -> None:
+        """
+        Write a metrics snapshot through the logger, tagged {"source": "impulse_metrics"}.
+        By default each dump covers the calls since the previous one.
+        """
+        snapshot = self.metrics(reset = reset)
+        if len(snapshot) == 0:
+            return
+        self.logger.log(payload = {
+            "tracer_id": self.instance_id,
+            "session_id": self.session_id,
+            "timestamp": format_timestamp(time.time_ns()),
+            "metrics": snapshot
+        }, metadata = {"source": "impulse_metrics"})
+
+    def _dump_metrics_periodically(self) -> None:
+        interval = cast(float, self.metrics_interval_s)
+        while not self._stop_metrics.wait(interval):
+            try:
+                self.dump_metrics()
+            except Exception as e:
+                print(f"[TRACE WARNING]: Failed to dump metrics: {e}")
+
     def classhook(self,
             thread_id: str = "default", 
             traced_methods: List[str] = field(default_factory=list),
@@ -311,92 +892,127 @@ class ImpulseTracer:
 
         raise NotImplementedError("Class decorator not yet implemented.")
     
+    def _get_sampler(self, 
+                     thread_id: str, 
+                     hook_sampler: Optional[BaseSampler] = None) -> Optional[BaseSampler]:
+        """
+        Resolve the sampler for a call: hook, then thread, then tracer.
+        """
+        if hook_sampler is not None:
+            return hook_sampler
+        return self.thread_samplers.get(thread_id, self.sampler)
+
+    def _sample_head(self, 
+                     sampler: Optional[BaseSampler], 
+                     trace_module: Dict[str, Any]) -> bool:
+        """
+        Head sampling decision, made once per root trace and inherited by nested calls.
+        """
+        parent: ImpulseTraceNode = IMPULSE_CURRENT_TRACE_ROOT.get()
+        if parent is not IMPULSE_GLOBAL_ROOT:
+            return parent.sampled
+        return sampler is None or sampler.sample_head(trace_module)
+
+    def _sample_tail(self, 
+                     sampler: Optional[BaseSampler], 
+                     status: str,
+                     duration_ns: int) -> bool:
+        """
+        Tail sampling decision for calls dropped at the head.
+        """
+        if sampler is None or not sampler.TAIL_SAMPLING:
+            return False
+        return sampler.sample_tail(status, duration_ns / 1e9)
+
     def _initialize_call(self) -> Dict[str, Any]:
         output = {}
         output["call_id"] = str(uuid.uuid4())
         return output
 
-    def _get_time(self, 
-                  field_name: str, 
-                  past_times: Dict[str,str] = {}, 
-                  delta_to: Optional[str] = None) -> Dict[str, Any]:
-        
-        now: datetime = datetime.now()
-        output = {"timestamps": {field_name: now.strftime("%Y-%m-%d %H:%M:%S.%f"), **past_times}}
+    def _get_timestamps(self, 
+                        start_ns: int, 
+                        duration_ns: int) -> Dict[str, Any]:
+        """
+        Render the call timestamps from the wall-clock start (time.time_ns())
+        and the monotonic duration (perf_counter_ns() delta).
+        """
+        return {
+            "start": format_timestamp(start_ns),
+            "end": format_timestamp(start_ns + duration_ns),
+            "start_to_end_seconds": f"{duration_ns / 1e9:.6f}"
+        }
 
-        if delta_to is not None:
-            timestamp = past_times[delta_to]
-            delta = now - datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S.%f')
-            output["timestamps"][f"{delta_to}_to_{field_name}_seconds"] = f"{delta.total_seconds():.6f}"
+    def _get_chunk_timestamps(self, 
+                              start_perf: int, 
+                              chunk_times: array) -> Dict[str, Any]:
+        """
+        Streaming metrics for async generators: time to first chunk, 
+        chunk count, and inter-chunk latency percentiles (nearest rank).
+        """
+        output: Dict[str, Any] = {"chunk_count": len(chunk_times)}
+        if len(chunk_times) == 0:
+            return output
+
+        output["start_to_first_chunk_seconds"] = f"{(chunk_times[0] - start_perf) / 1e9:.6f}"
+        if len(chunk_times) > 1:
+            gaps = sorted(chunk_times[i] - chunk_times[i - 1] for i in range(1, len(chunk_times)))
+            for pct in (50, 90, 99):
+                rank = max(0, -(-pct * len(gaps) // 100) - 1)
+                output[f"inter_chunk_p{pct}_seconds"] = f"{gaps[rank] / 1e9:.6f}"
         return output
 
+    def _open_stream(self, 
+                     record: ImpulseCallRecord, 
+                     max_bytes: int, 
+                     batch_bytes: int) -> StreamCapture:
+        """
+        Start a streamed output capture. Each batch is an ordinary record, so an 
+        open stream never holds a logger worker or a queue slot.
+        """
+        return StreamCapture(self.logger, {
+            "source": STREAM_SOURCE,
+            "call_id": record.call_id,
+            "tracer_id": self.instance_id
+        }, max_bytes, batch_bytes)
+
+    def _feed_stream(self, stream: StreamCapture, chunk: Any, serializer: ImpulseSerializer) -> None:
+        """
+        Encode a chunk with the hook's serializer (and its limits). Chunks past 
+        the stream's max_bytes are only counted.
+        """
+        if stream.full:
+            stream.skip()
+            return
+        data = chunk if isinstance(chunk, str) else json.dumps(serializer.conform(chunk))
+        stream.feed(data)
+
     def _process_inputs(self,
-                        sig: inspect.Signature,
+                        plan: CallPlan,
                         args: Tuple[Any, ...],
                         kwargs: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process the arguments to be logged.
-        Output written to the output dict.
          - If the function is a method, log the instance attributes.
+         - Binding and per-parameter serializers come from the precompiled plan.
         """
-        output = {}
-        bound_args: inspect.BoundArguments = sig.bind(*args, **kwargs)
-        bound_args.apply_defaults()
-    
-        arguments = {k: self._parse_item(v) for k, v in bound_args.arguments.items()}
-            
-        output["arguments"] = arguments
-
-        return output
+        return plan.process(args, kwargs)
 
-    def _parse_item(self, item: Any) -> Union[str,Dict[str, Any]]:
+    def _parse_item(self, item: Any, serializer: Optional[ImpulseSerializer] = None) -> Union[str,Dict[str, Any]]:
         """
         Parse the item to be logged.
-         - Try __str__() and __repr__() otherwise.
-         - If json.dumps() is successful, return the item as a dict.
-         - If both fail, return "No logging representation available."
-        """
-
-        # TODO: Add support for att
-        if hasattr(item, '__class__') and not isinstance(item, STANDARD_TYPES):
-
-            is_instance: bool = (not inspect.isbuiltin(item)) and item.__class__.__name__ != "type"
-            if not is_instance:
-                assert inspect.isclass(item), "Item is not a class or instance."
-
-            return {
-                "type": "instance" if is_instance else "class",
-                "classname": item.__class__.__name__ if is_instance else item.__name__,
-                "attr": {k: conform_output(v) for k, v in self._process_attr(item).items()}
-            }
-        
-        else:
-            return conform_output(item)
-
-    def _process_attr(self, 
-                    method_instance: Any) -> Dict[str, Any]:
-        """
-        Process the instance/method attributes to be logged.
-         - If instance_attr is None, log all non-method attributes.
-         - If instance_attr is not None, log only the attributes in instance_attr.
+         - Dispatched by type through the tracer's (or hook's) serializer (see ImpulseSerializer).
+         - Instances and classes are logged with their non-callable attributes.
+         - Falls back to str(), then "No logging representation available."
         """
-        incld_instance_attr = [ attr 
-                                for attr in dir(method_instance) 
-                                if not callable(getattr(method_instance, attr)) 
-                                and not attr.startswith('__') ]
-        return {
-            attr: conform_output(getattr(method_instance, attr)) 
-            for attr in incld_instance_attr
-        }   
+        return (serializer or self.serializer).parse(item)
 
     def _handle_exception(self, e: Exception,
-                     trace_output: Optional[Dict[str, Any]] = None) -> None:
+                     record: Optional[ImpulseCallRecord] = None) -> None:
         """
         Throw an error.
         """
-        if trace_output is not None:
-            trace_output["exception"] = f"{e}"
-            trace_output.update(self._get_time("end", trace_output["timestamps"], delta_to="start"))
+        if record is not None:
+            record.exception = f"{e}"
 
         raise e
 
@@ -404,19 +1020,139 @@ class ImpulseTracer:
                payload: Dict[str, Any]) -> None:
         """
         Validate and write the payload to the logger.
+         - "always":    validate every record on the caller's thread
+         - "sampled":   validate a validation_rate fraction of records
+         - "deferred":  validate on the logger's worker thread, before the write
+         - "off":       never validate
+        Records are written whether or not they validate; failures are counted in stats().
+        """
+        self.logger.log(payload=payload, metadata={"source": "impulse_tracer"}, before_write=self._prevalidate(payload))
+
+    async def _awrite(self, 
+                      payload: Dict[str, Any]) -> None:
+        """
+        _write for asyncio-native loggers, from a coroutine on the event loop.
+        """
+        await cast(BaseAsyncioLogger, self.logger).alog(
+            payload=payload, metadata={"source": "impulse_tracer"}, before_write=self._prevalidate(payload)
+        )
+
+    def _prevalidate(self, payload: Dict[str, Any]) -> Optional[Callable[[Any], Any]]:
+        """
+        Validate now per the validation mode, or return the validator to run before the write.
         """
+        if self.validation == VALIDATION_DEFERRED:
+            return self._validate
+
+        if self.validation == VALIDATION_ALWAYS or \
+                (self.validation == VALIDATION_SAMPLED and random.random() < self.validation_rate):
+            self._validate(payload)
+        return None
+
+    def _validate(self, payload: Dict[str, Any]) -> bool:
+        """
+        Check the payload against TraceSchema, counting the outcome.
+        The schema (and pydantic) is only imported once validation first runs.
+        """
+        from impulse_core.schema import TraceSchema
+
         try:
             TraceSchema(**payload)
+            failed = False
         except Exception as e:
-            print(f"[TRACE WARNING]: Payload does not conform to Trace schema: {e}")
-        finally:
-            self.logger.log(payload=payload, metadata={"source": "impulse_tracer"})
+            self.last_validation_error = f"{e}"
+            failed = True
+
+        with self._stats_lock:
+            self._stats["validated"] += 1
+            self._stats["validation_failures"] += failed
+        return not failed
 
-    def _flush_global_root(self):
+    def stats(self) -> Dict[str, Any]:
         """
-        Flush the global root.
+        Validation counters, plus the logger's queue stats.
+        """
+        with self._stats_lock:
+            output: Dict[str, Any] = dict(self._stats)
+        output["logger"] = self.logger.stats()
+        return output
+
+    def _release(self, node: ImpulseTraceNode) -> None:
+        """
+        Mark a call as completed. Root-level calls count towards this tracer's next 
+        global root segment, which the segment writer thread builds and logs.
+        """
+        node.completed = True
+        if len(node.parents) == 0 or node.parents[0] is not IMPULSE_GLOBAL_ROOT:
+            return
+        if self.root_segment_size is None and self.root_segment_interval is None:
+            return
+
+        with IMPULSE_GLOBAL_ROOT_LOCK:
+            self._root_completed += 1
+            due = self.root_segment_size is not None and self._root_completed >= self.root_segment_size
+            if due:
+                self._root_completed = 0
+            writer = self._segment_writer
+            if (writer is None or not writer.is_alive()) and not self._stop_segments.is_set(): ## not started yet, or lost to a fork
+                writer = self._segment_writer = threading.Thread(target = self._write_segments, 
+                                                                 name = "impulse-root-segments", 
+                                                                 daemon = True)
+                writer.start()
+        if due:
+            self._segment_due.set()
+
+    def _write_segments(self) -> None:
+        """
+        Segment writer thread: writes a segment when root_segment_size calls have 
+        completed, and every root_segment_interval seconds (if anything completed), 
+        keeping the build and validation of large segments off the calls' threads.
+        """
+        while not self._stop_segments.is_set():
+            due = self._segment_due.wait(self.root_segment_interval)
+            if self._stop_segments.is_set():
+                return
+            self._segment_due.clear()
+            self._flush_global_root(final = False, skip_empty = not due)
+
+    def _stop_segment_writer(self) -> None:
+        writer = self._segment_writer
+        if writer is None:
+            return
+        self._stop_segments.set()
+        self._segment_due.set()
+        writer.join()
+        self._segment_writer = None
+
+    def _flush_global_root(self, final: bool = True, skip_empty: bool = False):
+        """
+        Flush this tracer's part of the global root.
+         - Writes a segment record listing the root-level calls this tracer completed since 
+           its last segment, then releases those nodes. All segments share the global root's 
+           call_id (one per process) and are merged back by tree.build_trace_trees.
+         - Trace logs written at module level go to whichever tracer writes the next segment.
+         - final marks the segment written at shutdown.
         """
         assert IMPULSE_GLOBAL_ROOT is not None, "Global root context not found."
+        segment = IMPULSE_GLOBAL_ROOT_SEGMENT
+
+        with IMPULSE_GLOBAL_ROOT_LOCK:
+            children = IMPULSE_GLOBAL_ROOT.children
+            written = [child for child in children.values() 
+                       if child.completed and (child.trace_module or {}).get("tracer_id") == self.instance_id]
+            if skip_empty and len(written) == 0 and len(IMPULSE_GLOBAL_ROOT.trace_logs) == 0:
+                return
+            for child in written:
+                del children[child.call_id]
+            trace_logs = IMPULSE_GLOBAL_ROOT.export_logs()
+            IMPULSE_GLOBAL_ROOT.trace_logs.clear()
+
+            index = segment["index"]
+            segment["index"] += 1
+            start_ns, start_perf = self._root_segment_start
+            self._root_segment_start = (time.time_ns(), time.perf_counter_ns())
+            self._root_completed = 0
+
         output = EMPTY_TRACE_TEMPLATE.copy()
         output["function"] = {
             "type": "Function",
@@ -433,11 +1169,14 @@ class ImpulseTracer:
             "hook_metadata": {}
         }
         output["call_id"] = IMPULSE_GLOBAL_ROOT.call_id
-        output["timestamps"]= {
-            "start": IMPULSE_GLOBAL_ROOT.creation_time,
-            "end": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        output["timestamps"] = self._get_timestamps(start_ns, time.perf_counter_ns() - start_perf)
+        output["stack_trace"] = {
+            "process_id": IMPULSE_GLOBAL_ROOT.process_id,
+            "parents": [],
+            "children": [child.export_node() for child in written if child.recorded]
         }
-        output["stack_trace"], output["trace_logs"] = IMPULSE_GLOBAL_ROOT.export()
+        output["trace_logs"] = trace_logs
+        output["segment"] = {"index": index, "final": final}
         output["status"] = "success"
         output["output"] = None
         output["exception"] = None
@@ -448,10 +1187,38 @@ class ImpulseTracer:
         """
         Shutdown the tracer.
         """
+        self._stop_metrics_dumper()
+        self._stop_segment_writer()
         if flush_global_root:
             self._flush_global_root()
 
         self.logger.shutdown()
+
+    def _stop_metrics_dumper(self) -> None:
+        """
+        Stop periodic metrics dumps, writing a final one.
+        """
+        if self._metrics_dumper is None:
+            return
+        self._stop_metrics.set()
+        self._metrics_dumper.join()
+        self._metrics_dumper = None
+        self.dump_metrics()
+
+    async def ashutdown(self, flush_global_root: bool = True) -> None:
+        """
+        Shutdown the tracer from a coroutine, letting an asyncio-native logger 
+        finish its queue on the event loop.
+        """
+        self._stop_metrics_dumper()
+        self._stop_segment_writer()
+        if flush_global_root:
+            self._flush_global_root()
+
+        if isinstance(self.logger, BaseAsyncioLogger):
+            await self.logger.ashutdown()
+        else:
+            self.logger.shutdown()
         
 
 if __name__ == "__main__":
@@ -0,0 +1,303 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, cast
+
+from impulse_core.templates import TIMESTAMP_FORMAT
+
+class TraceTreeNode:
+    """
+    One call in a rebuilt trace tree.
+     - record is the call's payload; for the global root, its segments merged into one.
+     - depth is 0 for roots; size counts the node and all of its descendants.
+    """
+    __slots__ = ("call_id", "record", "parent", "children", "depth", "size")
+
+    def __init__(self, call_id: str, record: Dict[str, Any]):
+        self.call_id = call_id
+        self.record = record
+        self.parent: Optional[TraceTreeNode] = None
+        self.children: List[TraceTreeNode] = []
+        self.depth: int = 0
+        self.size: int = 1
+
+    def __repr__(self) -> str:
+        return f"TraceTreeNode(call_id={self.call_id!r}, depth={self.depth}, size={self.size})"
+
+    @property
+    def start(self) -> str:
+        timestamps = self.record.get("timestamps") or {}
+        return timestamps.get("start") or ""
+
+    def walk(self) -> Iterator["TraceTreeNode"]:
+        """
+        The node and its descendants, depth first, children in call order.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+@dataclass
+class TraceForest:
+    """
+    Call trees rebuilt from trace records (see build_trace_trees).
+    nodes: Dict[str, TraceTreeNode]     - every call, by call_id
+    roots: List[TraceTreeNode]          - calls without a parent among the records, by start time
+    missing_parents: Dict[str, str]     - call_id -> parent call_id, for roots whose parent
+                                          was referenced but not among the records
+    add() merges more records in place, attaching waiting roots once their parent arrives.
+    """
+    nodes: Dict[str, TraceTreeNode] = field(default_factory = dict)
+    roots: List[TraceTreeNode] = field(default_factory = list)
+    missing_parents: Dict[str, str] = field(default_factory = dict)
+
+    def __post_init__(self):
+        self._parent_of: Dict[str, str] = {}
+        self._merged: Dict[str, Tuple[set, set]] = {} # call_id -> (children, segment indexes) merged so far
+        self._waiting: Dict[str, List[TraceTreeNode]] = {} # missing parent call_id -> its roots
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, call_id: str) -> bool:
+        return call_id in self.nodes
+
+    def get(self, call_id: str) -> Optional[TraceTreeNode]:
+        return self.nodes.get(call_id)
+
+    def walk(self) -> Iterator[TraceTreeNode]:
+        """
+        Every node, tree by tree, depth first.
+        """
+        for root in self.roots:
+            yield from root.walk()
+
+    def add(self, records: Iterable[Any]) -> List[TraceTreeNode]:
+        """
+        Merge more records into the trees, e.g. while tailing a live session.
+        Each new call is placed under its parent (depths set, ancestors' sizes 
+        updated); roots waiting for it are attached below it. Returns the nodes 
+        created or updated; records already merged are skipped.
+        """
+        changed = []
+        for record in records:
+            ingested = self._ingest(record)
+            if ingested is None:
+                continue
+            node, created, child_ids = ingested
+            if created:
+                self._place(node)
+            else:
+                _finish_segment(node.record)
+            for child_id in child_ids:
+                child = self.nodes.get(child_id)
+                if child is not None and child.parent is None and self._parent_of.get(child_id) == node.call_id:
+                    self._attach(child, node)
+            changed.append(node)
+        return changed
+
+    def _ingest(self, record: Any) -> Optional[Tuple[TraceTreeNode, bool, List[str]]]:
+        """
+        Register a record: (node, whether it is new, child call_ids it lists), or None to skip it.
+        """
+        if isinstance(record, dict) and "call_id" not in record and isinstance(record.get("payload"), dict):
+            record = record["payload"]
+        if not isinstance(record, dict) or "call_id" not in record:
+            return None
+
+        call_id = record["call_id"]
+        node = self.nodes.get(call_id)
+        created = node is None
+        if node is None:
+            node = self.nodes[call_id] = TraceTreeNode(call_id, record)
+        elif "segment" in record:
+            if call_id not in self._merged:
+                node.record = _own_segment(node.record)
+                self._merged[call_id] = (set(child.get("call_id") for child in node.record["stack_trace"]["children"]),
+                                         {node.record["segment"].get("index")})
+            seen_children, seen_segments = self._merged[call_id]
+            index = (record.get("segment") or {}).get("index")
+            if index in seen_segments:
+                return None
+            seen_segments.add(index)
+            _merge_segment(node.record, record, seen_children)
+        else:
+            return None
+
+        stack_trace = record.get("stack_trace") or {}
+        parents = stack_trace.get("parents") or []
+        if len(parents) > 0 and parents[0].get("call_id") is not None:
+            self._parent_of[call_id] = parents[0]["call_id"]
+        child_ids = []
+        for child in stack_trace.get("children") or []:
+            if child.get("call_id") is not None:
+                self._parent_of.setdefault(child["call_id"], call_id)
+                child_ids.append(child["call_id"])
+        return node, created, child_ids
+
+    def _place(self, node: TraceTreeNode) -> None:
+        """
+        Link a new node to its parent, and the roots waiting for it to itself.
+        """
+        parent_id = self._parent_of.get(node.call_id)
+        parent = self.nodes.get(parent_id) if parent_id is not None else None
+        if parent is not None and parent is not node:
+            self._link(node, parent)
+        else:
+            _insert_by_start(self.roots, node)
+            if parent_id is not None and parent is None:
+                self.missing_parents[node.call_id] = parent_id
+                self._waiting.setdefault(parent_id, []).append(node)
+
+        for child in self._waiting.pop(node.call_id, []):
+            if child.parent is None:
+                self._attach(child, node)
+
+    def _attach(self, child: TraceTreeNode, parent: TraceTreeNode) -> None:
+        """
+        Move a root under parent, unless that would close a cycle.
+        """
+        ancestor: Optional[TraceTreeNode] = parent
+        while ancestor is not None:
+            if ancestor is child:
+                return
+            ancestor = ancestor.parent
+
+        self.roots.remove(child)
+        self.missing_parents.pop(child.call_id, None)
+        self._link(child, parent)
+
+    def _link(self, child: TraceTreeNode, parent: TraceTreeNode) -> None:
+        child.parent = parent
+        _insert_by_start(parent.children, child)
+        for node in child.walk():
+            node.depth = cast(TraceTreeNode, node.parent).depth + 1
+        ancestor: Optional[TraceTreeNode] = parent
+        while ancestor is not None:
+            ancestor.size += child.size
+            ancestor = ancestor.parent
+
+def build_trace_trees(records: Iterable[Any]) -> TraceForest:
+    """
+    Rebuild call trees from trace records in linear time.
+     - records: payloads, or log entries ({"payload", "log_metadata"}) as written by
+       the loggers; anything without a call_id (metrics dumps, streams) is skipped.
+     - Parent links come from each record's stack_trace: the child's own parent link
+       (which also covers parents in other processes), then the parents' children lists.
+     - Records sharing a call_id are merged: global root segments union their children
+       and trace logs and widen the time range; other repeats keep the first record.
+     - Children are ordered by start time; depth and subtree size are filled in.
+    Later records can be merged into the result with TraceForest.add().
+    """
+    forest = TraceForest()
+    nodes = forest.nodes
+    for record in records:
+        forest._ingest(record)
+
+    for call_id in forest._merged:
+        _finish_segment(nodes[call_id].record)
+
+    for call_id, node in nodes.items():
+        parent_id = forest._parent_of.get(call_id)
+        parent = nodes.get(parent_id) if parent_id is not None else None
+        if parent is None or parent is node:
+            if parent_id is not None and parent is None:
+                forest.missing_parents[call_id] = parent_id
+                forest._waiting.setdefault(parent_id, []).append(node)
+            forest.roots.append(node)
+        else:
+            node.parent = parent
+            parent.children.append(node)
+
+    ## depth top-down, then sizes bottom-up; nodes unreachable from a root sit on a parent cycle
+    order = _visit(forest.roots)
+    if len(order) < len(nodes):
+        reached = set(id(node) for node in order)
+        for node in nodes.values():
+            if id(node) not in reached:
+                if node.parent is not None:
+                    node.parent.children.remove(node)
+                    node.parent = None
+                forest.roots.append(node)
+                extra = _visit([node], reached)
+                order.extend(extra)
+
+    for node in reversed(order):
+        node.children.sort(key = _start_key)
+        if node.parent is not None:
+            node.parent.size += node.size
+    forest.roots.sort(key = _start_key)
+    return forest
+
+def _visit(roots: List[TraceTreeNode], reached: Optional[set] = None) -> List[TraceTreeNode]:
+    """
+    Nodes reachable from roots, parents before children, setting depth.
+    """
+    order = []
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if reached is not None:
+            if id(node) in reached:
+                continue
+            reached.add(id(node))
+        node.depth = 0 if node.parent is None else node.parent.depth + 1
+        order.append(node)
+        stack.extend(node.children)
+    return order
+
+def _start_key(node: TraceTreeNode) -> str:
+    return node.start
+
+def _insert_by_start(nodes: List[TraceTreeNode], node: TraceTreeNode) -> None:
+    """
+    Insert keeping nodes ordered by start time; live records mostly land at the end.
+    """
+    idx = len(nodes)
+    while idx > 0 and nodes[idx - 1].start > node.start:
+        idx -= 1
+    nodes.insert(idx, node)
+
+def _own_segment(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a global root segment that further segments can be merged into.
+    """
+    merged = dict(record)
+    merged["stack_trace"] = dict(record.get("stack_trace") or {})
+    merged["stack_trace"]["children"] = list(merged["stack_trace"].get("children") or [])
+    merged["trace_logs"] = list(record.get("trace_logs") or [])
+    merged["timestamps"] = dict(record.get("timestamps") or {})
+    merged["segment"] = dict(record.get("segment") or {})
+    return merged
+
+def _merge_segment(merged: Dict[str, Any], segment: Dict[str, Any], seen: set) -> None:
+    """
+    Add a global root segment to a merged record, in place.
+    seen: set   - call_ids already among the merged record's children
+    """
+    children = merged["stack_trace"]["children"]
+    for child in (segment.get("stack_trace") or {}).get("children") or []:
+        if child.get("call_id") not in seen:
+            seen.add(child.get("call_id"))
+            children.append(child)
+    merged["trace_logs"].extend(segment.get("trace_logs") or [])
+
+    timestamps, other = merged["timestamps"], segment.get("timestamps") or {}
+    if other.get("start") and (not timestamps.get("start") or other["start"] < timestamps["start"]):
+        timestamps["start"] = other["start"]
+    if other.get("end") and (not timestamps.get("end") or other["end"] > timestamps["end"]):
+        timestamps["end"] = other["end"]
+
+    info, other_info = merged["segment"], segment.get("segment") or {}
+    info["index"] = max(info.get("index", 0), other_info.get("index", 0))
+    info["final"] = bool(info.get("final")) or bool(other_info.get("final"))
+
+def _finish_segment(merged: Dict[str, Any]) -> None:
+    """
+    Recompute the duration of a merged record from its widened time range.
+    """
+    timestamps = merged["timestamps"]
+    if timestamps.get("start") and timestamps.get("end"):
+        elapsed = datetime.strptime(timestamps["end"], TIMESTAMP_FORMAT) - datetime.strptime(timestamps["start"], TIMESTAMP_FORMAT)
+        timestamps["start_to_end_seconds"] = f"{elapsed.total_seconds():.6f}"
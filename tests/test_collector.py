@@ -0,0 +1,119 @@
+import json
+import multiprocessing as mp
+import os
+import pickle
+from pathlib import Path
+import pytest
+from impulse_core.collector import CollectorLogger, ImpulseCollector
+from impulse_core.logger import LocalLogger
+from impulse_core.tracer import ImpulseTracer, attach_trace_context, current_trace_context
+
+pytestmark = pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="needs fork")
+
+@pytest.fixture
+def collector_dir(testdir = Path("./tests/")):
+    sub_dir = testdir / "temp_collector"
+    yield sub_dir
+    if sub_dir.exists():
+        for item in sub_dir.iterdir():
+            item.unlink()
+        sub_dir.rmdir()
+
+def start_collector(sub_dir: Path) -> ImpulseCollector:
+    return ImpulseCollector(
+        sink = LocalLogger, 
+        sink_kwargs = {"uri": str(sub_dir), "filename": "log.jsonl", "format": "jsonl"},
+        start_method = "fork"
+    ).start()
+
+def read_records(sub_dir: Path):
+    with open(sub_dir / "log.jsonl", "r") as f:
+        return [json.loads(line)["payload"] for line in f.read().splitlines()]
+
+def worker(logger: CollectorLogger, context, worker_id: int) -> None:
+    tracer = ImpulseTracer(logger, validation = "off")
+
+    @tracer.hook("worker")
+    def work(i: int) -> int:
+        return i * worker_id
+
+    with attach_trace_context(context):
+        for i in range(5):
+            work(i)
+    tracer.shutdown(flush_global_root = False)
+
+def test_collector_single_writer(collector_dir):
+    collector = start_collector(collector_dir)
+    logger = collector.logger()
+    tracer = ImpulseTracer(logger, validation = "off")
+    ctx = mp.get_context("fork")
+
+    @tracer.hook("dispatch")
+    def dispatch(n_workers: int) -> int:
+        context = current_trace_context()
+        procs = [ctx.Process(target = worker, args = (collector.logger(), context, w)) for w in range(n_workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        return n_workers
+
+    dispatch(3)
+    tracer.shutdown(flush_global_root = False)
+    collector.shutdown(timeout = 10)
+
+    records = read_records(collector_dir)
+    parent = [r for r in records if r["trace_module"]["thread_id"] == "dispatch"]
+    children = [r for r in records if r["trace_module"]["thread_id"] == "worker"]
+    assert len(parent) == 1 and len(children) == 15
+
+    parent = parent[0]
+    assert parent["stack_trace"]["process_id"] == os.getpid()
+    assert parent["stack_trace"]["children"] == [] ## other processes' calls are linked from their side
+    for child in children:
+        link = child["stack_trace"]["parents"][0]
+        assert link["call_id"] == parent["call_id"]
+        assert link["process_id"] == os.getpid()
+        assert child["stack_trace"]["process_id"] != os.getpid()
+    assert len({child["stack_trace"]["process_id"] for child in children}) == 3
+
+def test_collector_fork_inherits_context(collector_dir):
+    collector = start_collector(collector_dir)
+    tracer = ImpulseTracer(collector.logger(), validation = "off")
+    ctx = mp.get_context("fork")
+
+    @tracer.hook("forked")
+    def child_call() -> str:
+        return "child"
+
+    def child_main():
+        child_call()
+        tracer.shutdown(flush_global_root = False) ## inherited logger, rebuilt after fork
+
+    @tracer.hook("forked")
+    def parent_call() -> str:
+        p = ctx.Process(target = child_main)
+        p.start()
+        p.join()
+        return "parent"
+
+    parent_call()
+    tracer.shutdown(flush_global_root = False)
+    collector.shutdown(timeout = 10)
+
+    records = {r["output"]: r for r in read_records(collector_dir)}
+    assert records["child"]["stack_trace"]["parents"][0]["call_id"] == records["parent"]["call_id"]
+    assert records["parent"]["stack_trace"]["children"] == []
+
+def test_collector_logger_pickle():
+    with mp.Manager() as manager:
+        records = manager.Queue()
+        logger = CollectorLogger(records = records, max_queue_size = 8, queue_policy = "drop_newest")
+        copy = pickle.loads(pickle.dumps(logger))
+        logger.shutdown()
+
+        assert copy.max_queue_size == 8 and copy.queue_policy == "drop_newest"
+        copy.log({"i": 1}, before_write = lambda payload: None) ## goes through the rebuilt pool
+        copy.join()
+        copy.shutdown()
+        assert records.get(timeout = 5) == ({"i": 1}, None)
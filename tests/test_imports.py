@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = 50 ## `import impulse_core` takes ~11ms; pymongo + pydantic took it to ~160ms
+
+def run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], capture_output = True, text = True, check = True)
+
+def test_import_time_budget():
+    stderr = run("import impulse_core", "-X", "importtime").stderr
+    cumulative = [int(line.split("|")[1]) for line in stderr.splitlines() 
+                  if line.startswith("import time:") and line.split("|")[-1] == " impulse_core"]
+    assert len(cumulative) == 1
+    assert cumulative[0] / 1000 < IMPORT_BUDGET_MS, f"import impulse_core took {cumulative[0] / 1000:.1f}ms"
+
+def test_heavy_dependencies_deferred():
+    code = """
+import sys
+from impulse_core import ImpulseTracer, LocalLogger, MongoLogger
+from impulse_core.logger import DummyLogger
+
+loaded = lambda: sorted(name for name in ("pymongo.errors", "pydantic") if name in sys.modules)
+print(loaded())
+
+tracer = ImpulseTracer(DummyLogger(io_time = 0), validation = "off")
+@tracer.hook()
+def f(x):
+    return x
+f(1)
+tracer.shutdown()
+print(loaded())
+
+tracer._validate({})
+print(loaded())
+
+MongoLogger(uri = "mongodb://localhost:1/").shutdown() ## the client connects lazily
+print(loaded())
+"""
+    assert run(code).stdout.splitlines() == ["[]", "[]", "['pydantic']", "['pydantic', 'pymongo.errors']"]
+
+def test_schema_does_not_load_tracer():
+    code = """
+import sys
+from impulse_core.schema import TraceSchema, EMPTY_TRACE_TEMPLATE
+import impulse_core
+print("impulse_core.tracer" in sys.modules, impulse_core.EMPTY_TRACE_TEMPLATE is EMPTY_TRACE_TEMPLATE)
+"""
+    assert run(code).stdout.split() == ["False", "True"]
+
+
+def test_tree_does_not_load_tracer():
+    code = """
+import sys
+from impulse_core.tree import build_trace_trees
+from impulse_core.templates import TIMESTAMP_FORMAT
+loaded = "impulse_core.tracer" in sys.modules
+from impulse_core.tracer import TIMESTAMP_FORMAT as TRACER_FORMAT
+print(loaded, TRACER_FORMAT is TIMESTAMP_FORMAT)
+"""
+    assert run(code).stdout.split() == ["False", "True"]
@@ -1,10 +1,16 @@
 import asyncio
 import queue
+import threading
+import time
 import pytest
+from dataclasses import dataclass
 import os
 import json
 from pathlib import Path
-from impulse_core.logger import BaseAsyncLogger, LocalLogger, LOCAL_ENTRY_SEP, END_OF_STREAM_TAG
+import gzip
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from impulse_core.logger import DummyLogger, load_manifest, select_segments, AsyncioLocalLogger, AsyncioMongoLogger, BaseAsyncLogger, LocalLogger, MongoLogger, LOCAL_ENTRY_SEP, END_OF_STREAM_TAG, BLOB_REF_KEY, resolve_blobs, find_trace_record, MongoTail
 
 # Fixture setups
 @pytest.fixture
@@ -84,4 +90,412 @@ def test_local_logger_stream(local_logger):
         assert logged_data["payload"] == "Stream 1: Token 0. Token 1. Token 2. Token 3. "
         assert logged_data["log_metadata"] == metadata
 
-    os.remove(filepath)
\ No newline at end of file
+    os.remove(filepath)
+
+def test_local_logger_jsonl(testdir):
+
+    sub_dir = testdir / "temp_jsonl"
+    local_logger = LocalLogger(uri=str(sub_dir), filename="log.jsonl", format="jsonl", flush_every=0)
+    for i in range(3):
+        local_logger.log({"i": i}, metadata={"meta": "data"})
+    local_logger.shutdown() ## flush-on-shutdown only
+
+    with open(local_logger.filename, 'r') as f:
+        lines = f.read().splitlines()
+        assert [json.loads(line)["payload"]["i"] for line in lines] == [0, 1, 2]
+        assert lines[0] == '{"payload":{"i":0},"log_metadata":{"meta":"data"}}'
+
+    os.remove(local_logger.filename)
+    sub_dir.rmdir()
+
+def test_local_logger_flush_interval(testdir):
+    sub_dir = testdir / "temp_flush"
+    local_logger = LocalLogger(uri=str(sub_dir), filename="log.jsonl", format="jsonl", flush_every=0, flush_interval_ms=20)
+    local_logger.log({"i": 0})
+    local_logger.join()
+    time.sleep(0.2) ## no further traffic: the flusher thread writes it out
+
+    with open(local_logger.filename, 'r') as f:
+        assert [json.loads(line)["payload"] for line in f.read().splitlines()] == [{"i": 0}]
+    local_logger.shutdown()
+    assert local_logger._flusher is None
+
+    os.remove(local_logger.filename)
+    sub_dir.rmdir()
+
+def test_local_logger_dedup(local_logger):
+    local_logger.dedup_threshold = 64
+    system = "You are a helpful assistant. " * 10
+    for i in range(3):
+        local_logger.log({
+            "arguments": {"system": system, "shots": {"q": system, "a": "ok"}, "i": i},
+            "output": "short"
+        })
+    local_logger.join()
+    local_logger.flush()
+
+    with open(local_logger.filename, 'r') as f:
+        records = [json.loads(entry)["payload"] for entry in f.read().split(LOCAL_ENTRY_SEP)]
+
+    blobs = local_logger.load_blobs()
+    assert len(blobs) == 2 ## the string, and the dict holding a reference to it
+    assert records[0]["arguments"]["system"][BLOB_REF_KEY] in blobs
+    assert records[0]["output"] == "short"
+    assert resolve_blobs(records[2], blobs.__getitem__) == {
+        "arguments": {"system": system, "shots": {"q": system, "a": "ok"}, "i": 2},
+        "output": "short"
+    }
+    assert local_logger.stats()["blob_refs"] == 9
+
+def test_dedup_cache_bounded():
+    logger = DummyLogger(io_time = 0, dedup_threshold = 16, dedup_cache_size = 1)
+    for value in ["a" * 32, "b" * 32, "a" * 32, "a" * 32]:
+        logger.log({"output": value})
+    logger.join()
+    logger.shutdown()
+
+    assert len(logger._blobs_seen) == 1
+    assert len(logger.blobs) == 2
+    assert logger.stats()["blobs_written"] == 3 ## "a" was evicted by "b", then stored again (idempotently)
+    assert [resolve_blobs(entry["payload"], logger.blobs.__getitem__)["output"][0] for entry in logger.buffer] == list("abaa")
+
+def test_dedup_requires_blob_store():
+    with pytest.raises(AssertionError, match = "does not support dedup"):
+        BaseAsyncLogger(uri = "unused", dedup_threshold = 64)
+
+def test_local_logger_persistent_handle(local_logger, mocker):
+    local_logger.fsync = True
+    fsync = mocker.spy(os, "fsync")
+
+    local_logger.log({"i": 0})
+    local_logger.log({"i": 1})
+    local_logger.join()
+    handle = local_logger._file
+    local_logger.log({"i": 2})
+    local_logger.shutdown()
+
+    assert handle is not None and handle.closed
+    assert fsync.call_count == 4 ## every record, plus shutdown
+
+    with open(local_logger.filename, 'r') as f:
+        content = f.read().split(LOCAL_ENTRY_SEP)
+        assert [json.loads(c)["payload"]["i"] for c in content] == [0, 1, 2]
+
+# Tests for the bounded logging queue
+@dataclass
+class GatedLogger(BaseAsyncLogger):
+    uri: str = ""
+    num_threads: int = 1
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.gate = threading.Event()
+        self.written = []
+
+    def _write(self, payload, metadata=None, *args, **kwargs):
+        self.gate.wait()
+        self.written.append(payload)
+
+@pytest.mark.parametrize("policy, expected, dropped", [
+    ("drop_newest", [0, 1, 2], {"dropped_full": 2}),
+    ("drop_oldest", [0, 3, 4], {"dropped_evicted": 2}),
+    ("block", [0, 1, 2], {"dropped_timeout": 2}),
+])
+def test_logger_queue_policies(policy, expected, dropped):
+    gated = GatedLogger(max_queue_size=2, queue_policy=policy, block_timeout=0.01)
+    gated.log(0)
+    while gated.stats()["queued"] > 0: ## wait for record 0 to be picked up
+        time.sleep(0.001)
+
+    for i in range(1, 5):
+        gated.log(i)
+    gated.gate.set()
+    gated.shutdown()
+
+    assert gated.written == expected
+    assert gated.dropped_count == 2
+    assert dropped.items() <= gated.stats().items()
+
+def test_logger_queue_errors_only():
+    gated = GatedLogger(max_queue_size=2, queue_policy="errors_only")
+    gated.log({"i": 0})
+    while gated.stats()["queued"] > 0:
+        time.sleep(0.001)
+
+    for payload in [{"i": 1}, {"i": 2}, {"i": 3, "status": "error"}, {"i": 4}]:
+        gated.log(payload)
+    gated.gate.set()
+    gated.shutdown()
+
+    assert [p["i"] for p in gated.written] == [0, 2, 3]
+    assert gated.stats()["dropped_evicted"] == 1
+    assert gated.stats()["dropped_full"] == 1
+
+def test_local_logger_rotation(local_logger):
+    rotating = LocalLogger(uri=local_logger.uri, filename="log.jsonl", format="jsonl", rotate_bytes=200)
+    for i in range(10):
+        start = f"2023-08-20 10:00:{i:02d}.000000"
+        rotating.log({"i": i, "pad": "x" * 60, "timestamps": {"start": start, "end": start}})
+    rotating.shutdown()
+
+    manifest = load_manifest(rotating.manifest_filename)
+    segments = manifest["segments"]
+    assert len(segments) > 1
+    assert sum(seg["records"] for seg in segments) == 10
+    assert all(seg["compressed"] and seg["file"].endswith(".jsonl.gz") for seg in segments if seg["closed"])
+
+    records = []
+    for seg in segments:
+        path = os.path.join(local_logger.uri, seg["file"])
+        opener = gzip.open if seg["compressed"] else open
+        with opener(path, "rt") as f:
+            lines = [json.loads(line)["payload"] for line in f.read().splitlines()]
+        assert len(lines) == seg["records"]
+        assert seg["start"] == lines[0]["timestamps"]["start"] and seg["end"] == lines[-1]["timestamps"]["end"]
+        records += lines
+    assert [r["i"] for r in records] == list(range(10))
+
+    selected = select_segments(rotating.manifest_filename, start="2023-08-20 10:00:08.000000")
+    assert selected == [os.path.join(local_logger.uri, segments[-1]["file"])]
+
+def test_local_logger_rotation_interval(local_logger):
+    rotating = LocalLogger(uri=local_logger.uri, filename="log.json", rotate_interval_s=0.05, compress=False)
+    rotating.log({"i": 0})
+    rotating.join()
+    time.sleep(0.2) ## idle: the flusher thread closes the expired segment
+    segments = load_manifest(rotating.manifest_filename)["segments"]
+    assert [(seg["records"], seg["closed"]) for seg in segments] == [(1, True)]
+
+    rotating.log({"i": 1})
+    rotating.log({"i": 2})
+    rotating.shutdown()
+
+    segments = load_manifest(rotating.manifest_filename)["segments"]
+    assert segments[0]["records"] == 1 and sum(seg["records"] for seg in segments) == 3
+    assert not any(seg["compressed"] for seg in segments)
+
+# Tests for asyncio-native loggers
+def test_asyncio_local_logger(testdir, mocker):
+    sub_dir = testdir / "temp_asyncio"
+    local_logger = AsyncioLocalLogger(uri=str(sub_dir), filename="log.jsonl", format="jsonl", max_batch=8)
+    write_batch = mocker.spy(local_logger, "_write_batch_blocking")
+
+    async def run():
+        for i in range(20):
+            await local_logger.alog({"i": i}, metadata={"meta": "data"})
+        local_logger.log({"i": 20}) ## sync call on the loop, no thread hop
+        await local_logger.join()
+
+    asyncio.run(run())
+    local_logger.log({"i": 21}) ## no running loop: written directly
+    local_logger.shutdown()
+
+    with open(local_logger.filename, 'r') as f:
+        assert [json.loads(line)["payload"]["i"] for line in f.read().splitlines()] == list(range(22))
+    assert all(len(call.args[0]) <= 8 for call in write_batch.call_args_list)
+    assert local_logger.stats()["written"] == 22
+    assert local_logger.stats()["batches"] < 22
+
+    os.remove(local_logger.filename)
+    sub_dir.rmdir()
+
+def test_asyncio_local_logger_unflushed_on_loop_close(testdir):
+    sub_dir = testdir / "temp_asyncio"
+    local_logger = AsyncioLocalLogger(uri=str(sub_dir))
+
+    async def run():
+        for i in range(5):
+            local_logger.log({"i": i})
+        # returns without join(): the writer is cancelled when the loop closes
+
+    asyncio.run(run())
+    local_logger.shutdown()
+
+    with open(local_logger.filename, 'r') as f:
+        assert [json.loads(entry)["payload"]["i"] for entry in f.read().split(LOCAL_ENTRY_SEP)] == list(range(5))
+
+    os.remove(local_logger.filename)
+    sub_dir.rmdir()
+
+def test_asyncio_local_logger_before_write_off_loop(testdir):
+    sub_dir = testdir / "temp_asyncio"
+    local_logger = AsyncioLocalLogger(uri=str(sub_dir), filename="log.jsonl", format="jsonl")
+    callback_threads = []
+
+    async def run():
+        for i in range(3):
+            await local_logger.alog({"i": i}, before_write = lambda payload: callback_threads.append(threading.get_ident()))
+        await local_logger.join()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    local_logger.shutdown()
+    assert len(callback_threads) == 3 and loop_thread not in callback_threads
+
+    os.remove(local_logger.filename)
+    sub_dir.rmdir()
+
+def test_asyncio_local_logger_unclosed_stream(testdir):
+    sub_dir = testdir / "temp_asyncio"
+    local_logger = AsyncioLocalLogger(uri=str(sub_dir), filename="log.jsonl", format="jsonl")
+    stream: queue.Queue = queue.Queue()
+    stream.put("partial ")
+    stream.put("output")
+    local_logger.log(stream, metadata={"meta": "stream"}) ## no loop, never closed
+
+    with open(local_logger.filename, 'r') as f:
+        assert json.loads(f.read())["payload"] == "partial output"
+    local_logger.shutdown()
+
+    os.remove(local_logger.filename)
+    sub_dir.rmdir()
+
+def test_asyncio_local_logger_shutdown_waits_for_write(testdir, monkeypatch):
+    sub_dir = testdir / "temp_asyncio"
+    local_logger = AsyncioLocalLogger(uri=str(sub_dir), filename="log.jsonl", format="jsonl")
+    started = threading.Event()
+    write_batch = local_logger._write_batch_blocking
+    def slow_write(batch):
+        started.set()
+        time.sleep(0.1)
+        write_batch(batch)
+    monkeypatch.setattr(local_logger, "_write_batch_blocking", slow_write)
+
+    async def run():
+        await local_logger.alog({"i": 0})
+        while not started.is_set(): ## the write is running in the executor
+            await asyncio.sleep(0.005)
+        local_logger.shutdown()
+    asyncio.run(run())
+
+    assert local_logger._file is None ## not reopened after close
+    with open(local_logger.filename, 'r') as f:
+        assert json.loads(f.read())["payload"] == {"i": 0}
+
+    os.remove(local_logger.filename)
+    sub_dir.rmdir()
+
+# Tests for MongoLogger
+@pytest.fixture
+def mongo_client(monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    client = mongomock.MongoClient()
+    monkeypatch.setattr("impulse_core.logger.pm.MongoClient", lambda *args, **kwargs: client)
+    return client
+
+def test_mongo_logger_insert_one(mongo_client):
+    mongo_logger = MongoLogger()
+    for i in range(5):
+        mongo_logger.log({"i": i}, metadata={"meta": "data"})
+    mongo_logger.shutdown()
+
+    docs = list(mongo_client["impulse_logs"]["logs"].find({}, {"_id": 0}))
+    assert sorted(d["payload"]["i"] for d in docs) == list(range(5))
+    assert docs[0]["log_metadata"] == {"meta": "data"}
+
+def test_mongo_logger_batched(mongo_client, mocker):
+    mongo_logger = MongoLogger(batched=True, batch_size=10, flush_interval_ms=60_000)
+    insert_many = mocker.spy(mongo_logger._collection, "insert_many")
+    insert_one = mocker.spy(mongo_logger._collection, "insert_one")
+
+    for i in range(25):
+        mongo_logger.log({"i": i})
+    mongo_logger.shutdown() ## drains the partial batch
+
+    assert insert_one.call_count == 0
+    assert [len(call.args[0]) for call in insert_many.call_args_list] == [10, 10, 5]
+    assert all(call.kwargs["ordered"] is False for call in insert_many.call_args_list)
+    assert mongo_client["impulse_logs"]["logs"].count_documents({}) == 25
+
+def test_mongo_logger_batched_thresholds(mongo_client):
+    collection = mongo_client["impulse_logs"]["logs"]
+
+    by_bytes = MongoLogger(batched=True, batch_size=1000, batch_bytes=1, flush_interval_ms=60_000)
+    by_bytes.log({"i": 0})
+    by_bytes.join()
+    assert collection.count_documents({}) == 1
+
+    by_time = MongoLogger(batched=True, batch_size=1000, flush_interval_ms=10)
+    by_time.log({"i": 1})
+    by_time.join()
+    time.sleep(0.2)
+    assert collection.count_documents({}) == 2
+
+    by_bytes.shutdown()
+    by_time.shutdown()
+
+
+def test_mongo_logger_dedup(mongo_client):
+    mongo_logger = MongoLogger(batched=True, dedup_threshold=64)
+    prompt = "Answer in one word. " * 10
+    for i in range(4):
+        mongo_logger.log({"arguments": {"prompt": prompt, "i": i}, "output": prompt})
+    mongo_logger.shutdown()
+
+    assert mongo_client["impulse_logs"]["blobs"].count_documents({}) == 1
+    docs = [d["payload"] for d in mongo_client["impulse_logs"]["logs"].find({}, {"_id": 0})]
+    assert all(d["output"][BLOB_REF_KEY] == d["arguments"]["prompt"][BLOB_REF_KEY] for d in docs)
+    assert resolve_blobs(docs[0], mongo_logger.load_blob)["output"] == prompt
+
+def test_mongo_logger_indexes_and_tree(mongo_client):
+    mongo_logger = MongoLogger(create_indexes=True)
+    index_names = set(mongo_client["impulse_logs"]["logs"].index_information())
+    assert {"impulse_session_thread_start", "impulse_call_id", "impulse_parent_call_id"} <= index_names
+
+    def record(call_id, parent = None, thread_id = "t1"):
+        return {
+            "call_id": call_id,
+            "trace_module": {"session_id": "s", "thread_id": thread_id},
+            "arguments": {"x": "bulky"},
+            "output": "bulky",
+            "stack_trace": {"parents": [] if parent is None else [{"call_id": parent}], "children": []}
+        }
+    for args in [("a",), ("b", "a"), ("c", "b"), ("d", "a", "t2"), ("e",)]:
+        mongo_logger.log(record(*args))
+    mongo_logger.shutdown()
+
+    docs = mongo_logger.find_tree("a")
+    assert docs[0]["payload"]["call_id"] == "a"
+    assert sorted(d["payload"]["call_id"] for d in docs) == ["a", "b", "c", "d"]
+    assert all("arguments" not in d["payload"] and "output" not in d["payload"] for d in docs)
+
+    assert sorted(d["payload"]["call_id"] for d in mongo_logger.find_tree("a", max_depth = 0)) == ["a", "b", "d"]
+    assert sorted(d["payload"]["call_id"] for d in 
+                  mongo_logger.find_tree("a", match = {"payload.trace_module.thread_id": "t1"})) == ["a", "b", "c"]
+    assert mongo_logger.find_tree("a", projection = None)[1]["payload"]["output"] == "bulky"
+    assert mongo_logger.find_tree("missing") == []
+    assert find_trace_record(mongo_client["impulse_logs"]["logs"], "c")["arguments"] == {"x": "bulky"}
+
+def test_mongo_tail(mongo_client):
+    collection = mongo_client["impulse_logs"]["logs"]
+    collection.insert_one({"_id": ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(hours = 1)),
+                           "payload": {"call_id": "old", "trace_module": {"session_id": "s"}}})
+    tail = MongoTail(collection, query = {"payload.trace_module.session_id": "s"}, use_change_stream = False)
+    assert tail.poll() == []
+
+    mongo_logger = MongoLogger()
+    for i in range(3):
+        mongo_logger.log({"call_id": f"c{i}", "trace_module": {"session_id": "s"}, "output": "bulky"})
+    mongo_logger.log({"call_id": "other", "trace_module": {"session_id": "t"}})
+    mongo_logger.shutdown()
+
+    docs = tail.poll()
+    assert [d["payload"]["call_id"] for d in docs] == ["c0", "c1", "c2"]
+    assert all("output" not in d["payload"] and "_id" not in d for d in docs)
+    assert tail.poll() == [] ## the overlap window is re-read, but nothing is returned twice
+
+    collection.insert_one({"payload": {"call_id": "c3", "trace_module": {"session_id": "s"}}})
+    assert [d["payload"]["call_id"] for d in tail.poll()] == ["c3"]
+    tail.close()
+
+def test_asyncio_mongo_logger(mongo_client):
+    mongo_logger = AsyncioMongoLogger(use_motor=False)
+
+    async def run():
+        for i in range(10):
+            await mongo_logger.alog({"i": i})
+        await mongo_logger.ashutdown()
+
+    asyncio.run(run())
+    docs = list(mongo_client["impulse_logs"]["logs"].find({}, {"_id": 0}))
+    assert sorted(d["payload"]["i"] for d in docs) == list(range(10))
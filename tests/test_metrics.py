@@ -0,0 +1,37 @@
+import random
+import pytest
+from impulse_core.metrics import HookMetrics, LatencyHistogram
+
+def test_histogram_quantiles():
+    hist = LatencyHistogram(sub_buckets = 8)
+    rng = random.Random(0)
+    samples = [int(rng.lognormvariate(13, 1.5)) for _ in range(20000)]
+    for i, ns in enumerate(samples):
+        hist.record(ns, error = i % 10 == 0)
+
+    samples.sort()
+    for q in (0.5, 0.9, 0.99):
+        exact = samples[int(q * len(samples)) - 1]
+        assert hist.quantile(q) == pytest.approx(exact, rel = 0.1)
+
+    snapshot = hist.snapshot()
+    assert snapshot["calls"] == 20000 and snapshot["errors"] == 2000
+    assert snapshot["error_rate"] == pytest.approx(0.1)
+    assert snapshot["max_seconds"] == samples[-1] / 1e9
+    assert snapshot["p99_seconds"] <= snapshot["max_seconds"]
+
+def test_histogram_reset_and_bounds():
+    hist = LatencyHistogram()
+    hist.record(0)
+    hist.record(10 ** 15)
+    assert hist.calls == 2 and hist.quantile(1.0) == 10 ** 15
+
+    hist.snapshot(reset = True)
+    assert hist.calls == 0 and sum(hist.counts) == 0 and hist.quantile(0.5) == 0.0
+
+def test_hook_metrics_snapshot():
+    metrics = HookMetrics()
+    assert metrics.histogram("t", "a") is metrics.histogram("t", "a")
+    metrics.histogram("t", "a").record(1000)
+    metrics.histogram("t", "b")
+    assert [(m["thread_id"], m["hook_id"], m["calls"]) for m in metrics.snapshot()] == [("t", "a", 1)]
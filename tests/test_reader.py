@@ -0,0 +1,104 @@
+import gzip
+import json
+import os
+from pathlib import Path
+import shutil
+import pytest
+from impulse_core.logger import LocalLogger
+from impulse_core.reader import ImpulseLogReader, LocalLogIndex
+
+@pytest.fixture
+def log_dir():
+    sub_dir = Path("./tests/") / "temp_reader"
+    sub_dir.mkdir(exist_ok = True)
+    yield sub_dir
+    shutil.rmtree(sub_dir)
+
+def record(i: int) -> dict:
+    start = f"2023-08-20 10:00:{i:02d}.000000"
+    return {
+        "call_id": f"call-{i}",
+        "trace_module": {"session_id": f"s{i % 2}", "thread_id": "t", "hook_id": f"h{i % 3}"},
+        "timestamps": {"start": start, "end": start},
+        "arguments": {"note": "session_id: s1, status: error"}, ## decoys for the byte prefilter
+        "status": "error" if i % 5 == 0 else "success"
+    }
+
+@pytest.mark.parametrize("fmt", ["pretty", "jsonl"])
+def test_reader_formats_and_filters(log_dir, fmt):
+    logger = LocalLogger(uri = str(log_dir), filename = f"log.{fmt}", format = fmt)
+    for i in range(20):
+        logger.log(record(i), metadata = {"source": "impulse_tracer"})
+    logger.log({"metrics": []}, metadata = {"source": "impulse_metrics"})
+    logger.shutdown()
+
+    assert len(list(ImpulseLogReader(logger.filename))) == 21
+    assert [p["call_id"] for p in ImpulseLogReader(logger.filename, source = "impulse_tracer").payloads()] == \
+        [f"call-{i}" for i in range(20)]
+
+    reader = ImpulseLogReader(logger.filename, session_id = "s1", status = "error")
+    assert [p["call_id"] for p in reader.payloads()] == ["call-5", "call-15"]
+
+    reader = ImpulseLogReader(logger.filename, hook_id = ["h0", "h1"], 
+                              start = "2023-08-20 10:00:03.000000", end = "2023-08-20 10:00:07.000000")
+    assert [p["call_id"] for p in reader.payloads()] == ["call-3", "call-4", "call-6", "call-7"]
+
+    with open(logger.filename, "rb") as f:
+        data = f.read()
+    for offset, length, entry in ImpulseLogReader(logger.filename, session_id = "s0").scan():
+        assert json.loads(data[offset:offset + length]) == entry
+
+def test_reader_gzip_and_manifest(log_dir):
+    logger = LocalLogger(uri = str(log_dir), filename = "log.jsonl", format = "jsonl", rotate_bytes = 1000)
+    for i in range(20):
+        logger.log(record(i))
+    logger.shutdown()
+    assert any(name.endswith(".gz") for name in os.listdir(log_dir))
+
+    reader = ImpulseLogReader.from_manifest(logger.manifest_filename)
+    assert [p["call_id"] for p in reader.payloads()] == [f"call-{i}" for i in range(20)]
+
+    reader = ImpulseLogReader.from_manifest(logger.manifest_filename, start = "2023-08-20 10:00:18.000000")
+    assert len(reader.paths) == 1
+    assert [p["call_id"] for p in reader.payloads()] == ["call-18", "call-19"]
+
+    gz_path = next(str(log_dir / name) for name in sorted(os.listdir(log_dir)) if name.endswith(".gz"))
+    with gzip.open(gz_path, "rb") as f:
+        data = f.read()
+    for offset, length, entry in ImpulseLogReader(gz_path).scan():
+        assert json.loads(data[offset:offset + length]) == entry
+
+def test_reader_resolves_blobs(log_dir):
+    logger = LocalLogger(uri = str(log_dir), filename = "log.json", dedup_threshold = 32)
+    prompt = "You are a careful assistant. " * 4
+    for i in range(3):
+        logger.log({"arguments": {"prompt": prompt}, "output": i})
+    logger.shutdown()
+
+    assert [p["arguments"]["prompt"] for p in ImpulseLogReader(logger.filename).payloads()] == [prompt] * 3
+
+@pytest.mark.parametrize("fmt,rotate_bytes", [("pretty", None), ("jsonl", None), ("jsonl", 1000)])
+def test_local_log_index(log_dir, fmt, rotate_bytes):
+    logger = LocalLogger(uri = str(log_dir), filename = f"log.{fmt}", format = fmt, index = True, 
+                         rotate_bytes = rotate_bytes, flush_every = 0)
+    for i in range(20):
+        logger.log(record(i))
+    logger.log({"metrics": []}, metadata = {"source": "impulse_metrics"}) ## not a trace record: not indexed
+    logger.log(dict(record(3), status = "success")) ## relogged call_id: latest wins
+    logger.shutdown()
+
+    index = LocalLogIndex(logger.index_filename)
+    assert len(index.entries) == 21
+    assert index.get("call-7")["call_id"] == "call-7"
+    assert index.get("call-3")["status"] == "success"
+    assert index.get("missing") is None
+    assert [p["call_id"] for p in index.session("s1")] == [f"call-{i}" for i in range(1, 20, 2)] + ["call-3"]
+    assert [p["call_id"] for p in index.hook("h2")] == [f"call-{i}" for i in range(2, 20, 3)]
+    assert sorted(index.keys("session_id")) == ["s0", "s1"]
+
+    os.remove(logger.index_filename)
+    rebuilt = LocalLogIndex.rebuild(logger.manifest_filename if rotate_bytes else logger.filename)
+    assert rebuilt.path == logger.index_filename
+    assert [(e["call_id"], e["offset"], e["length"]) for e in rebuilt.entries] == \
+        [(e["call_id"], e["offset"], e["length"]) for e in index.entries]
+    assert rebuilt.get("call-11") == index.get("call-11")
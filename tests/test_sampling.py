@@ -0,0 +1,114 @@
+import json
+import os
+import time
+from pathlib import Path
+import pytest
+from impulse_core.logger import LOCAL_ENTRY_SEP, LocalLogger
+from impulse_core.sampling import HeadSampler, TailSampler
+from impulse_core.tracer import ImpulseTracer
+
+# Fixture setups
+@pytest.fixture
+def testdir():
+    return Path("./tests/")
+
+@pytest.fixture
+def local_logger(testdir):
+
+    sub_dir = testdir / "temp"
+    if not os.path.exists(sub_dir):
+        sub_dir.mkdir()
+    assert os.path.exists(sub_dir)
+
+    yield LocalLogger(uri=str(sub_dir))
+
+    for item in sub_dir.iterdir():
+        item.unlink()  # Removes files
+
+    sub_dir.rmdir()   # Removes the directory itself
+
+@pytest.fixture
+def tracer(local_logger):
+    return ImpulseTracer(local_logger, {"tracing_context": "unit_test"})
+
+class Payload:
+    """
+    Counts how often the serializer touches it.
+    """
+    encoded = 0
+
+def read_records(tracer: ImpulseTracer):
+    tracer.shutdown(flush_global_root = False)
+    filepath = Path(tracer.logger.filename)
+    if not filepath.exists():
+        return []
+    with open(filepath, 'r') as f:
+        records = [json.loads(entry)["payload"] for entry in f.read().split(LOCAL_ENTRY_SEP)]
+    os.remove(filepath)
+    return records
+
+def count_encodes(tracer: ImpulseTracer) -> None:
+    Payload.encoded = 0
+    def encode(p: Payload) -> str:
+        Payload.encoded += 1
+        return "payload"
+    tracer.serializer.register(Payload, encode)
+
+def test_head_sampler_drops_whole_tree(tracer):
+
+    count_encodes(tracer)
+    tracer.set_sampler(HeadSampler(rate = 0.0))
+
+    @tracer.hook(thread_id = "test_sampling", sampler = HeadSampler(rate = 1.0))
+    def inner(p: Payload) -> Payload:
+        return p
+
+    @tracer.hook(thread_id = "test_sampling")
+    def outer(p: Payload) -> Payload:
+        return inner(p)
+
+    outer(Payload())
+    assert Payload.encoded == 0
+    assert read_records(tracer) == []
+
+def test_head_sampler_per_thread(tracer):
+
+    tracer.set_sampler(HeadSampler(rate = 0.0))
+    tracer.set_sampler(HeadSampler(rate = 1.0), thread_id = "kept")
+
+    @tracer.hook(thread_id = "kept")
+    def kept(x: int) -> int:
+        return x
+
+    @tracer.hook(thread_id = "dropped")
+    def dropped(x: int) -> int:
+        return kept(x)
+
+    kept(1)
+    dropped(2)
+    records = read_records(tracer)
+    assert [r["arguments"]["x"] for r in records] == [1]
+
+def test_tail_sampler_keeps_errors_and_slow_calls(tracer):
+
+    count_encodes(tracer)
+
+    @tracer.hook(thread_id = "test_sampling", sampler = TailSampler(latency_threshold = 0.05))
+    def call(p: Payload, delay: float = 0.0, fail: bool = False) -> str:
+        time.sleep(delay)
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    call(Payload())
+    assert Payload.encoded == 0
+
+    with pytest.raises(ValueError):
+        call(Payload(), fail = True)
+    call(Payload(), delay = 0.06)
+    assert Payload.encoded == 2
+
+    records = read_records(tracer)
+    assert [r["status"] for r in records] == ["error", "success"]
+    assert records[0]["arguments"] == {"p": "payload", "delay": 0.0, "fail": True}
+    assert records[1]["output"] == "done"
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import pytest
+from impulse_core.serializer import BUDGET_EXHAUSTED, TRUNCATED_KEY, ImpulseSerializer, SizeLimits, charging
+
+@pytest.fixture
+def serializer():
+    return ImpulseSerializer()
+
+@dataclass
+class Message:
+    role: str
+    content: str
+
+    def render(self) -> str:
+        return f"{self.role}: {self.content}"
+
+def test_serializer_standard_types(serializer):
+    assert serializer.parse("prompt") == "prompt"
+    assert serializer.parse(1.5) == 1.5
+    assert serializer.parse(None) is None
+    assert serializer.parse((1, "a")) == [1, "a"]
+    assert serializer.parse({1: "a", None: [True]}) == {"1": "a", "null": [True]}
+
+def test_serializer_instances_and_classes(serializer):
+    msg = Message(role = "user", content = "hi")
+    assert serializer.parse(msg) == {
+        "type": "instance",
+        "classname": "Message",
+        "attr": {"role": "user", "content": "hi"}
+    }
+    assert serializer.parse(Message)["type"] == "class"
+    assert Message in serializer._attr_cache
+
+    # nested non-standard values are converted in place, not the whole container
+    assert serializer.parse([msg]) == [str(msg)]
+
+def test_serializer_registered_encoder(serializer):
+    serializer.register(Message, lambda m: {"role": m.role, "content": m.content})
+    serializer.register(datetime, lambda d: d.isoformat())
+
+    output = serializer.parse({"messages": [Message("system", "be brief")], "at": datetime(2023, 8, 20)})
+    assert output == {
+        "messages": [{"role": "system", "content": "be brief"}],
+        "at": "2023-08-20T00:00:00"
+    }
+    json.dumps(output)
+
+def test_serializer_circular_reference(serializer):
+    loop = [1]
+    loop.append(loop)
+    assert serializer.parse(loop) == str(loop)
+
+def test_serializer_size_limits(serializer):
+    limited = serializer.with_limits(SizeLimits(max_string = 4, max_items = 2, max_depth = 2))
+
+    output = limited.parse("abcdefgh")
+    assert output.startswith("abcd...[truncated 8 chars, sha256:")
+    assert output == limited.parse("abcdefgh")
+    assert output != limited.parse("abcdefgX")
+
+    assert limited.parse([1, 2, 3, 4]) == [1, 2, "...[truncated 2 of 4 items]"]
+    assert limited.parse({"a": 1, "b": 2, "c": 3}) == {"a": 1, "b": 2, TRUNCATED_KEY: "1 of 3 items"}
+    assert limited.parse([[["deep"]]]) == [["...[truncated: list of 1 items]"]]
+
+    # the unlimited serializer is untouched
+    assert serializer.parse("abcdefgh") == "abcdefgh"
+
+def test_serializer_record_budget(serializer):
+    limited = serializer.with_limits(SizeLimits(max_bytes = 100))
+
+    budget = limited.new_budget()
+    with charging(budget):
+        first = limited.parse("x" * 80)
+        second = limited.parse(["y" * 80, "z"])
+
+    assert first == "x" * 80
+    assert second[0].startswith("y" * 18 + "...[truncated 80 chars")
+    assert second[1] == BUDGET_EXHAUSTED
+    assert serializer.new_budget() is None
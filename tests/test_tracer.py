@@ -6,9 +6,14 @@ from datetime import datetime as dt
 import pytest
 import os
 import json
+import random
+import threading
+import time
 from pathlib import Path
-from impulse_core.tracer import ImpulseTracer
-from impulse_core.logger import LOCAL_ENTRY_SEP, LocalLogger
+from impulse_core.schema import TraceSchema
+from impulse_core.tracer import IMPULSE_GLOBAL_ROOT, ImpulseTraceNode, ImpulseTracer, StreamCapture, format_timestamp, trace_log
+from impulse_core.logger import LOCAL_ENTRY_SEP, AsyncioLocalLogger, DummyLogger, LocalLogger, join_streams
+from impulse_core.serializer import SizeLimits
 
 ## ROADMAP ####################################################################
 
@@ -415,4 +420,491 @@ def test_tracer_stack_trace_exception(tracer, tracer_metadata):
         assert len(logged_data_2["payload"]["stack_trace"]["children"]) == 0
         assert logged_data_2["payload"]["stack_trace"]["parents"][0]["fn_name"] == "<module>"
         
-    os.remove(filepath)
\ No newline at end of file
+    os.remove(filepath)
+# Argument binding (precompiled call plan)
+def test_tracer_call_plan_binding(tracer):
+
+    local_logger = tracer.logger
+
+    @tracer.hook(thread_id = "test_plan")
+    def test_fn(x: int, *rest, y: int = 2, z: str = "z", **extra) -> str:
+        return str(x + y)
+
+    test_fn(1, 7, 8, y = 3, w = "w")
+    test_fn(x = 1)
+    with pytest.raises(TypeError):
+        test_fn(1, x = 2)
+    tracer.shutdown()
+
+    filepath = Path(local_logger.filename)
+    with open(filepath, 'r') as f:
+        content = f.read().split(LOCAL_ENTRY_SEP)
+        first, second = json.loads(content[0]), json.loads(content[1])
+
+        assert first["payload"]["arguments"] == {"x": 1, "rest": [7, 8], "y": 3, "z": "z", "extra": {"w": "w"}}
+        assert list(first["payload"]["arguments"]) == ["x", "rest", "y", "z", "extra"]
+        assert second["payload"]["arguments"] == {"x": 1, "rest": [], "y": 2, "z": "z", "extra": {}}
+        assert json.loads(content[2])["payload"]["function"]["name"] == "<module>"
+
+    os.remove(filepath)
+
+# Timestamps (monotonic durations, rendered at export)
+def test_tracer_timestamps(tracer):
+
+    local_logger = tracer.logger
+
+    @tracer.hook(thread_id = "test_time")
+    def test_fn(x: int) -> int:
+        trace_log({"step": "sleeping"}, printout = False)
+        time.sleep(0.01)
+        return x
+
+    test_fn(1)
+    tracer.shutdown()
+
+    filepath = Path(local_logger.filename)
+    with open(filepath, 'r') as f:
+        payload = json.loads(f.read().split(LOCAL_ENTRY_SEP)[0])["payload"]
+        timestamps = payload["timestamps"]
+
+        start = dt.strptime(timestamps["start"], "%Y-%m-%d %H:%M:%S.%f")
+        end = dt.strptime(timestamps["end"], "%Y-%m-%d %H:%M:%S.%f")
+        seconds = float(timestamps["start_to_end_seconds"])
+        assert seconds >= 0.01
+        assert abs((end - start).total_seconds() - seconds) < 1e-5
+        assert start <= dt.strptime(payload["trace_logs"][0]["timestamp"], "%Y-%m-%d %H:%M:%S.%f") <= end
+        TraceSchema(**payload)
+
+    os.remove(filepath)
+
+def test_format_timestamp():
+    now = time.time_ns()
+    expected = dt.fromtimestamp(now // 1000 / 1e6).strftime("%Y-%m-%d %H:%M:%S.%f")
+    assert format_timestamp(now) == expected
+    assert format_timestamp(now + 1000) != expected
+
+# Schema validation modes
+@pytest.mark.parametrize("validation, validated", [
+    ("always", 3),
+    ("deferred", 3),
+    ("sampled", 0),
+    ("off", 0),
+])
+def test_tracer_validation_modes(local_logger, validation, validated):
+
+    tracer = ImpulseTracer(local_logger, validation = validation, validation_rate = 0.0)
+
+    @tracer.hook(thread_id = "test_validation")
+    def test_fn(x: int) -> int:
+        return x
+
+    for i in range(3):
+        test_fn(i)
+    tracer.shutdown(flush_global_root = False)
+
+    stats = tracer.stats()
+    assert stats["validated"] == validated
+    assert stats["validation_failures"] == 0
+    assert stats["logger"]["dropped"] == 0
+
+def test_tracer_validation_failures_counted(tracer, capsys):
+
+    tracer._write({"call_id": "not-a-trace"})
+    tracer.shutdown(flush_global_root = False)
+
+    assert tracer.stats()["validation_failures"] == 1
+    assert "function" in tracer.last_validation_error
+    assert capsys.readouterr().out == ""
+
+# Global root segments
+def own_root_children(tracer: ImpulseTracer) -> list:
+    return [c for c in IMPULSE_GLOBAL_ROOT.children.values() if c.trace_module["tracer_id"] == tracer.instance_id]
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+def test_tracer_global_root_segments(local_logger):
+
+    tracer = ImpulseTracer(local_logger, root_segment_size = 3)
+
+    @tracer.hook(thread_id = "test_segments")
+    def test_fn(x: int) -> int:
+        return x
+
+    for i in range(7):
+        test_fn(i)
+        if i % 3 == 2: ## segments are written by the tracer's segment writer thread
+            assert wait_for(lambda: len(own_root_children(tracer)) == 0)
+    assert len(own_root_children(tracer)) == 1
+    tracer.shutdown()
+    assert len(own_root_children(tracer)) == 0
+
+    filepath = Path(local_logger.filename)
+    with open(filepath, 'r') as f:
+        records = [json.loads(c)["payload"] for c in f.read().split(LOCAL_ENTRY_SEP)]
+
+    calls = [r for r in records if r["trace_module"]["thread_id"] == "test_segments"]
+    segments = [r for r in records if r["trace_module"]["thread_id"] == "root"]
+    first = segments[0]["segment"]["index"]
+    assert [(s["segment"]["index"] - first, s["segment"]["final"]) for s in segments] == [(0, False), (1, False), (2, True)]
+    assert [len(s["stack_trace"]["children"]) for s in segments] == [3, 3, 1]
+    assert len({s["call_id"] for s in segments}) == 1
+    assert all(s["trace_module"]["session_id"] == tracer.session_id for s in segments)
+
+    linked = [c["call_id"] for s in segments for c in s["stack_trace"]["children"]]
+    assert linked == [c["call_id"] for c in calls]
+    assert all(c["stack_trace"]["parents"][0]["call_id"] == segments[0]["call_id"] for c in calls)
+
+    os.remove(filepath)
+
+def test_tracer_global_root_segment_interval():
+
+    logger = DummyLogger(io_time = 0.0)
+    other = ImpulseTracer(DummyLogger(io_time = 0.0), root_segment_size = None)
+    tracer = ImpulseTracer(logger, root_segment_size = None, root_segment_interval = 0.05)
+
+    @other.hook(thread_id = "other")
+    def other_fn(x: int) -> int:
+        return x
+
+    @tracer.hook(thread_id = "test_segments")
+    def test_fn(x: int) -> int:
+        return x
+
+    test_fn(1)
+    other_fn(2)
+    ## idle from here: the interval alone emits the segment, with this tracer's calls only
+    assert wait_for(lambda: any(e["payload"]["trace_module"]["thread_id"] == "root" for e in list(logger.buffer)))
+    segment = [e["payload"] for e in logger.buffer if e["payload"]["trace_module"]["thread_id"] == "root"][0]
+    assert [c["fn_name"] for c in segment["stack_trace"]["children"]] == [test_fn.__qualname__]
+    assert len(own_root_children(other)) == 1
+
+    time.sleep(0.15) ## nothing new completed: no empty segments
+    tracer.shutdown(flush_global_root = False)
+    other.shutdown()
+    assert len([e for e in logger.buffer if e["payload"]["trace_module"]["thread_id"] == "root"]) == 1
+
+# Trace nodes
+def test_trace_node_identity():
+
+    root = ImpulseTraceNode(name = "root", call_id = "root", trace_module = None)
+    twins = [ImpulseTraceNode(name = "child", call_id = f"child_{i}", trace_module = None) for i in range(2)]
+    for child in twins:
+        root.add_child(child)
+
+    assert twins[0] != twins[1]
+    assert len({twins[0], twins[1]}) == 2
+    assert not hasattr(root, "__dict__")
+
+    twins[0].export()
+    assert list(root.children) == ["child_0", "child_1"]
+
+    stack_trace, _ = root.export()
+    assert [c["call_id"] for c in stack_trace["children"]] == ["child_0", "child_1"]
+    assert root.children == {}
+
+# Concurrent calls of the same hook
+def test_tracer_concurrent_records():
+
+    tracer = ImpulseTracer(DummyLogger(io_time = 0), validation = "off")
+    n_calls = 2000
+
+    @tracer.hook(thread_id = "test_concurrency")
+    async def inner(x: int) -> str:
+        await asyncio.sleep(random.random() / 1000)
+        return f"inner_{x}"
+
+    @tracer.hook(thread_id = "test_concurrency")
+    async def outer(x: int) -> str:
+        await asyncio.sleep(random.random() / 1000)
+        return await inner(x)
+
+    async def run():
+        return await asyncio.gather(*[outer(i) for i in range(n_calls)])
+
+    outputs = asyncio.run(run())
+    tracer.shutdown(flush_global_root = False)
+    assert outputs == [f"inner_{i}" for i in range(n_calls)]
+
+    records = [entry["payload"] for entry in tracer.logger.buffer]
+    assert len(records) == 2 * n_calls
+    assert len({r["call_id"] for r in records}) == 2 * n_calls
+
+    by_call_id = {r["call_id"]: r for r in records}
+    for r in records:
+        assert r["status"] == "success"
+        assert r["output"] == f"inner_{r['arguments']['x']}"
+        if r["function"]["name"].endswith("outer"):
+            child = by_call_id[r["stack_trace"]["children"][0]["call_id"]]
+            assert child["arguments"] == r["arguments"]
+            assert child["stack_trace"]["parents"][0]["call_id"] == r["call_id"]
+
+def test_agen_chunk_timestamps():
+
+    logger = DummyLogger(io_time = 0.0)
+    tracer = ImpulseTracer(logger)
+
+    @tracer.hook("chunks")
+    async def gen(n: int):
+        for i in range(n):
+            await asyncio.sleep(0.001)
+            yield str(i)
+
+    async def run():
+        return [c async for c in gen(4)]
+
+    assert asyncio.run(run()) == ["0", "1", "2", "3"]
+    logger.join()
+
+    timestamps = logger.buffer[-1]["payload"]["timestamps"]
+    assert timestamps["chunk_count"] == 4
+    assert float(timestamps["start_to_first_chunk_seconds"]) > 0.0
+    assert float(timestamps["inter_chunk_p50_seconds"]) <= float(timestamps["inter_chunk_p99_seconds"])
+    assert float(timestamps["start_to_first_chunk_seconds"]) <= float(timestamps["start_to_end_seconds"])
+    TraceSchema(**logger.buffer[-1]["payload"])
+
+def test_agen_stream_output():
+
+    logger = DummyLogger(io_time = 0.0)
+    tracer = ImpulseTracer(logger)
+
+    @tracer.hook("stream", stream_output = True, stream_max_bytes = 8)
+    async def gen(n: int):
+        for i in range(n):
+            yield "ab"
+        yield {"done": True}
+
+    async def run():
+        return [c async for c in gen(3)]
+
+    assert len(asyncio.run(run())) == 4
+    logger.join()
+
+    stream = [r for r in logger.buffer if r["log_metadata"]["source"] == "impulse_tracer_stream"]
+    record = [r for r in logger.buffer if r["log_metadata"]["source"] == "impulse_tracer"][-1]["payload"]
+    assert len(stream) == 1
+    assert stream[0]["payload"] == "ababab{\""
+    assert stream[0]["log_metadata"]["call_id"] == record["call_id"]
+    assert stream[0]["log_metadata"]["final"]
+    assert record["output"] == {"streamed": True, "captured_bytes": 8, "truncated": True}
+    assert record["timestamps"]["chunk_count"] == 4
+
+def test_agen_stream_output_limits():
+
+    logger = DummyLogger(io_time = 0.0)
+    tracer = ImpulseTracer(logger)
+
+    @tracer.hook("stream", stream_output = True, stream_max_bytes = 64, limits = SizeLimits(max_items = 2))
+    async def gen():
+        yield list(range(100)) ## encoded with the hook's limits
+        yield "x" * 100        ## truncated at stream_max_bytes
+        yield list(range(100)) ## past the cap: counted, not encoded
+
+    async def run():
+        return [c async for c in gen()]
+
+    asyncio.run(run())
+    logger.join()
+
+    entries = list(logger.buffer)
+    record = [e["payload"] for e in entries if e["log_metadata"]["source"] == "impulse_tracer"][-1]
+    output = join_streams(entries)[record["call_id"]]["output"]
+    assert output.startswith('[0, 1, "...[truncated 98 of 100 items]"]x')
+    assert len(output.encode("utf-8")) == 64
+    assert record["output"]["captured_bytes"] == 64 ## the summary itself is limited to 2 items
+
+    capture = StreamCapture(logger, {}, max_bytes = 4, batch_bytes = 100)
+    capture.feed("abcdefgh")
+    assert capture.pending == ["abcd"] and capture.pending_bytes == 4
+
+def test_hook_size_limits():
+
+    logger = DummyLogger(io_time = 0.0)
+    tracer = ImpulseTracer(logger, limits = SizeLimits(max_string = 1000))
+
+    @tracer.hook("limits", limits = SizeLimits(max_string = 8, max_bytes = 64))
+    def summarize(document: str, chunks: list) -> str:
+        return document[:100]
+
+    @tracer.hook("limits")
+    def echo(document: str) -> str:
+        return document
+
+    document = "lorem ipsum " * 1000
+    summarize(document, [document] * 10)
+    echo(document)
+    logger.join()
+
+    limited, default = [r["payload"] for r in logger.buffer[-2:]]
+    assert limited["arguments"]["document"].startswith("lorem ip...[truncated 12000 chars, sha256:")
+    assert len(json.dumps(limited["arguments"]) + json.dumps(limited["output"])) < 1024
+    assert default["output"].startswith("lorem ipsum " * 10)
+    assert "[truncated 12000 chars" in default["output"]
+    TraceSchema(**limited)
+
+def test_agen_stream_output_batches(testdir):
+
+    sub_dir = testdir / "temp_stream"
+    logger = LocalLogger(uri = str(sub_dir), format = "jsonl", num_threads = 1, max_queue_size = 2)
+    tracer = ImpulseTracer(logger)
+
+    @tracer.hook("stream")
+    def lookup(i: int) -> str:
+        return f"token{i} "
+
+    @tracer.hook("stream", stream_output = True, stream_batch_bytes = 16)
+    async def gen(n: int):
+        for i in range(n):
+            yield lookup(i)
+
+    async def run():
+        return "".join([c async for c in gen(20)])
+
+    ## the stream is open while the nested records fill the bounded queue
+    result: list = []
+    worker = threading.Thread(target = lambda: result.append(asyncio.run(run())), daemon = True)
+    worker.start()
+    worker.join(timeout = 10)
+    assert not worker.is_alive(), "streaming hook deadlocked on the bounded logger"
+    tracer.shutdown(flush_global_root = False)
+
+    with open(logger.filename, 'r') as f:
+        entries = [json.loads(line) for line in f.read().splitlines()]
+    record = [e["payload"] for e in entries if e["log_metadata"]["source"] == "impulse_tracer" 
+              and e["payload"]["function"]["name"].endswith("gen")][0]
+    chunks = [e for e in entries if e["log_metadata"]["source"] == "impulse_tracer_stream"]
+
+    assert len(chunks) > 1
+    assert join_streams(entries) == {record["call_id"]: {"output": result[0], "complete": True}}
+    assert logger.stats()["dropped"] == 0
+
+    for item in sub_dir.iterdir():
+        item.unlink()
+    sub_dir.rmdir()
+
+def test_tracer_asyncio_logger(testdir, mocker):
+
+    sub_dir = testdir / "temp_asyncio"
+    logger = AsyncioLocalLogger(uri = str(sub_dir), format = "jsonl")
+    tracer = ImpulseTracer(logger, validation = "deferred")
+    alog = mocker.spy(logger, "alog")
+    log = mocker.spy(logger, "log")
+
+    @tracer.hook("asyncio")
+    async def double(x: int) -> int:
+        return 2 * x
+
+    @tracer.hook("asyncio")
+    async def count(n: int):
+        for i in range(n):
+            yield i
+
+    @tracer.hook("asyncio")
+    def triple(x: int) -> int:
+        return 3 * x
+
+    async def run():
+        outputs = [await double(i) for i in range(3)] + [i async for i in count(2)] + [triple(1)]
+        await tracer.ashutdown(flush_global_root = False)
+        return outputs
+
+    assert asyncio.run(run()) == [0, 2, 4, 0, 1, 3]
+    assert alog.call_count == 4
+    assert log.call_count == 1
+
+    with open(logger.filename, 'r') as f:
+        records = [json.loads(line)["payload"] for line in f.read().splitlines()]
+    assert [r["output"] for r in records] == [0, 2, 4, [0, 1], 3]
+    assert tracer.stats()["validation_failures"] == 0 and tracer.stats()["validated"] == 5
+
+    os.remove(logger.filename)
+    sub_dir.rmdir()
+
+def test_tracer_asyncio_agen_closed_early(testdir):
+
+    sub_dir = testdir / "temp_asyncio"
+    logger = AsyncioLocalLogger(uri = str(sub_dir), format = "jsonl", max_queue_size = 1)
+    tracer = ImpulseTracer(logger)
+
+    @tracer.hook("asyncio")
+    async def count(n: int):
+        for i in range(n):
+            yield i
+
+    async def run():
+        gen = count(10)
+        await gen.__anext__()
+        logger.log({"filler": True}) ## queue full: the close path must not wait on it
+        await gen.aclose()
+        await logger.join()
+        gen = count(10)
+        await gen.__anext__()
+        await gen.aclose()
+        await tracer.ashutdown(flush_global_root = False)
+
+    asyncio.run(run())
+    assert logger.stats()["dropped"] == 1
+    assert tracer.stats()["validation_failures"] == 0
+
+    with open(logger.filename, 'r') as f:
+        records = [json.loads(line)["payload"] for line in f.read().splitlines()]
+    assert records[0] == {"filler": True}
+    assert records[1]["status"] == "cancelled" and records[1]["output"] == [0]
+
+    os.remove(logger.filename)
+    sub_dir.rmdir()
+
+def test_tracer_metrics_only():
+
+    logger = DummyLogger(io_time = 0.0)
+    tracer = ImpulseTracer(logger)
+
+    @tracer.hook("metrics", hook_id = "fast", capture = "metrics")
+    def fast(x: int) -> int:
+        if x < 0:
+            raise ValueError("negative")
+        return x
+
+    @tracer.hook("metrics", hook_id = "traced")
+    def traced(x: int) -> int:
+        return fast(x)
+
+    for i in range(10):
+        traced(i)
+    with pytest.raises(ValueError):
+        fast(-1)
+    logger.join()
+
+    assert [r["payload"]["trace_module"]["hook_id"] for r in logger.buffer] == ["traced"] * 10
+    assert logger.buffer[0]["payload"]["stack_trace"]["children"] == []
+
+    metrics = {m["hook_id"]: m for m in tracer.metrics()}
+    assert metrics["fast"]["calls"] == 11 and metrics["fast"]["errors"] == 1
+    assert metrics["traced"]["calls"] == 10 and metrics["traced"]["errors"] == 0
+    assert 0 < metrics["fast"]["p50_seconds"] <= metrics["fast"]["max_seconds"]
+    assert metrics["traced"]["p99_seconds"] >= metrics["fast"]["p50_seconds"]
+
+def test_tracer_metrics_dump():
+
+    logger = DummyLogger(io_time = 0.0)
+    tracer = ImpulseTracer(logger, capture = "metrics", metrics_interval_s = 0.05)
+
+    @tracer.hook("metrics")
+    def work(x: int) -> int:
+        return x
+
+    for i in range(5):
+        work(i)
+    time.sleep(0.15)
+    work(5)
+    tracer.shutdown(flush_global_root = False)
+
+    dumps = [r["payload"] for r in logger.buffer if r["log_metadata"] == {"source": "impulse_metrics"}]
+    assert len(logger.buffer) == len(dumps)
+    assert sum(d["metrics"][0]["calls"] for d in dumps) == 6
+    assert dumps[0]["tracer_id"] == tracer.instance_id
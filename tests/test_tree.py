@@ -0,0 +1,98 @@
+import random
+from impulse_core.logger import DummyLogger
+from impulse_core.tracer import ImpulseTracer
+from impulse_core.tree import build_trace_trees
+
+def record(call_id: str, start: str, parent: str = None, children: list = (), **extra) -> dict:
+    return {
+        "call_id": call_id,
+        "timestamps": {"start": f"2023-08-20 10:00:{start}.000000", "end": f"2023-08-20 10:00:{start}.500000"},
+        "stack_trace": {
+            "parents": [] if parent is None else [{"call_id": parent}],
+            "children": [{"call_id": c} for c in children]
+        },
+        **extra
+    }
+
+def test_build_trace_trees_from_tracer():
+
+    logger = DummyLogger(io_time = 0)
+    tracer = ImpulseTracer(logger, root_segment_size = 2)
+
+    @tracer.hook(thread_id = "tree")
+    def leaf(x: int) -> int:
+        return x
+
+    @tracer.hook(thread_id = "tree")
+    def branch(n: int) -> int:
+        return sum(leaf(i) for i in range(n))
+
+    for n in range(1, 4):
+        branch(n)
+    tracer.shutdown()
+
+    entries = list(logger.buffer)
+    random.Random(0).shuffle(entries) ## order of arrival doesn't matter
+    forest = build_trace_trees(entries)
+
+    assert len(forest.roots) == 1
+    root = forest.roots[0]
+    assert root.record["trace_module"]["thread_id"] == "root"
+    assert len(root.record["stack_trace"]["children"]) == 3 ## segments merged
+    assert root.record["segment"]["final"]
+    assert all(c.record["function"]["name"].endswith("branch") for c in root.children)
+    assert [c.size for c in root.children] == [2, 3, 4]
+    assert root.size == 1 + 9
+    assert {node.depth for node in root.walk() if node.record["function"]["name"].endswith("leaf")} == {2}
+    assert all(node.parent.call_id == root.call_id for node in root.children)
+
+def test_build_trace_trees_links():
+
+    records = [
+        record("b", "02", parent = "a"),            ## only the child side knows the parent (other process)
+        record("a", "01", children = ["c"]),
+        record("c", "03"),                          ## only the parent side knows the child
+        record("c", "04", status = "duplicate"),    ## repeated call_id: first wins
+        record("d", "00", parent = "missing"),
+        {"payload": record("e", "05", parent = "b"), "log_metadata": None},
+        {"payload": {"metrics": []}, "log_metadata": None}
+    ]
+    forest = build_trace_trees(records)
+
+    assert len(forest) == 5
+    assert [r.call_id for r in forest.roots] == ["d", "a"]
+    assert forest.missing_parents == {"d": "missing"}
+    assert [c.call_id for c in forest.get("a").children] == ["b", "c"]
+    assert "status" not in forest.get("c").record
+    assert [(n.call_id, n.depth, n.size) for n in forest.walk()] == \
+        [("d", 0, 1), ("a", 0, 4), ("b", 1, 2), ("e", 2, 1), ("c", 1, 1)]
+
+def test_build_trace_trees_cycle():
+
+    forest = build_trace_trees([record("x", "01", parent = "y"), record("y", "02", parent = "x")])
+    assert len(forest.roots) == 1
+    assert sorted(n.call_id for n in forest.walk()) == ["x", "y"]
+
+def test_trace_forest_add_incremental():
+
+    records = [
+        record("r", "00", children = ["a"], segment = {"index": 0, "final": False}, trace_logs = ["x"]),
+        record("a", "01", parent = "r"),
+        record("b", "02", parent = "a"),
+        record("c", "03", parent = "b"),
+        record("d", "04", parent = "a"),
+        record("r", "05", children = ["e"], segment = {"index": 1, "final": True}, trace_logs = ["y"]),
+        record("e", "05")                   ## linked from the second root segment only
+    ]
+    expected = [(n.call_id, n.depth, n.size) for n in build_trace_trees(records).walk()]
+
+    for seed in range(5):
+        shuffled = list(records)
+        random.Random(seed).shuffle(shuffled)
+        forest = build_trace_trees(shuffled[:3])
+        forest.add(shuffled[3:])
+        forest.add(shuffled) ## already merged: no-op
+        assert [(n.call_id, n.depth, n.size) for n in forest.walk()] == expected
+        assert forest.missing_parents == {}
+        assert sorted(forest.get("r").record["trace_logs"]) == ["x", "y"]
+        assert forest.get("r").record["segment"] == {"index": 1, "final": True}